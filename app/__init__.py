@@ -4,7 +4,10 @@ from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_mail import Mail
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 import os
+import sqlite3
 import logging
 
 # Initialize extensions
@@ -20,6 +23,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@event.listens_for(Engine, 'connect')
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite only enforces foreign keys (and ON DELETE CASCADE) when asked to
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
 def create_app(test_config=None):
     # Create and configure the app
     app = Flask(__name__, instance_relative_config=True)
@@ -35,7 +47,39 @@ def create_app(test_config=None):
             JWT_ACCESS_TOKEN_EXPIRES=3600,  # 1 hour
             UPLOAD_FOLDER=os.path.join(app.root_path, 'static', 'uploads'),
             MAX_CONTENT_LENGTH=5 * 1024 * 1024,  # 5MB max file size
-            ALLOWED_EXTENSIONS={'png', 'jpg', 'jpeg', 'gif', 'webp'}
+            ALLOWED_EXTENSIONS={'png', 'jpg', 'jpeg', 'gif', 'webp', 'mp3', 'wav', 'ogg', 'm4a'},
+            MEDIA_MAX_AGE=3600,  # seconds, for media not named by content hash
+            USE_X_SENDFILE=os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true',
+            PAGE_SIZE_DEFAULT=50,
+            PAGE_SIZE_MAX=200,
+            RESPONSE_CACHE_ENABLED=True,
+            RESPONSE_CACHE_MAX_BYTES=32 * 1024 * 1024,  # 32MB of cached response bodies
+            RESPONSE_CACHE_TTL=60,  # seconds
+            BUNDLE_FOLDER=os.path.join(app.instance_path, 'bundles'),
+            USER_CACHE_TTL=60,  # seconds
+            USER_CACHE_MAX_ENTRIES=10000,
+            ANSWER_KEY_CACHE_MAX_ENTRIES=1000,  # sections
+            ANSWER_DIACRITIC_SCRIPTS=('latin', 'greek', 'cyrillic', 'arabic', 'hebrew'),
+            ANSWER_MAX_TYPOS=1,
+            QUIZ_POOL_CACHE_MAX_ENTRIES=1000,  # sections and levels
+            PASSWORD_HASH_METHOD=os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000'),
+            PASSWORD_SALT_LENGTH=16,
+            PASSWORD_HASH_WORKERS=4,
+            PASSWORD_HASH_QUEUE_SIZE=32,
+            MAIL_SERVER=os.environ.get('MAIL_SERVER', 'localhost'),
+            MAIL_PORT=int(os.environ.get('MAIL_PORT', 25)),
+            MAIL_USE_TLS=os.environ.get('MAIL_USE_TLS', 'false').lower() == 'true',
+            MAIL_USERNAME=os.environ.get('MAIL_USERNAME'),
+            MAIL_PASSWORD=os.environ.get('MAIL_PASSWORD'),
+            MAIL_DEFAULT_SENDER=os.environ.get('MAIL_DEFAULT_SENDER', 'no-reply@linguazone.local'),
+            EMAIL_OUTBOX_WORKER=True,
+            EMAIL_OUTBOX_POLL_INTERVAL=10,  # seconds
+            EMAIL_OUTBOX_BATCH_SIZE=50,
+            EMAIL_OUTBOX_MAX_ATTEMPTS=5,
+            EMAIL_OUTBOX_BACKOFF_SECONDS=30,
+            PROGRESS_WRITE_BEHIND=True,
+            PROGRESS_FLUSH_INTERVAL=5,  # seconds
+            PROGRESS_FLUSH_SIZE=500  # buffered attempts
         )
     else:
         # Load the test config if passed in
@@ -67,15 +111,57 @@ def create_app(test_config=None):
     from app.utils.error_handlers import register_error_handlers
     register_error_handlers(app)
 
+    # Record per-request query counts
+    from app.utils.query_stats import init_query_stats
+    init_query_stats(app)
+
+    # Configure the content response cache
+    from app.utils.content_cache import response_cache
+    response_cache.init_app(app)
+
+    # Configure the user cache of the auth decorators
+    from app.utils.user_cache import user_cache
+    user_cache.init_app(app)
+
+    # Configure the answer key cache used for grading
+    from app.utils.answer_key_cache import answer_key_cache
+    answer_key_cache.init_app(app)
+
+    # Configure the question id pools quizzes are sampled from
+    from app.utils.quiz_pool_cache import quiz_pool_cache
+    quiz_pool_cache.init_app(app)
+
+    # Configure the password hashing pool
+    from app.utils.password_hasher import password_hasher
+    password_hasher.init_app(app)
+
     # Register blueprints
     from app.controllers.api.auth_controller import auth_bp
     from app.controllers.api.level_controller import level_bp
     from app.controllers.api.section_controller import section_bp
     from app.controllers.api.question_controller import question_bp
+    from app.controllers.api.cache_controller import cache_bp
+    from app.controllers.api.media_controller import media_bp
+    from app.controllers.api.review_controller import review_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(level_bp, url_prefix='/api/level')
     app.register_blueprint(section_bp, url_prefix='/api/section')
     app.register_blueprint(question_bp, url_prefix='/api/question')
+    app.register_blueprint(cache_bp, url_prefix='/api/cache')
+    app.register_blueprint(media_bp, url_prefix='/api/media')
+    app.register_blueprint(review_bp, url_prefix='/api/review')
+
+    # Register CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+
+    # Start the email outbox worker with the first request
+    from app.services.email_outbox_service import outbox_worker
+    outbox_worker.init_app(app)
+
+    # Start the progress write-behind buffer with the first request
+    from app.services.progress_service import progress_buffer
+    progress_buffer.init_app(app)
 
     return app 
\ No newline at end of file
@@ -0,0 +1,112 @@
+import click
+from flask.cli import with_appcontext
+
+
+@click.command('export-bundles')
+@click.option('--level-id', type=int, default=None, help='Only export this level.')
+@with_appcontext
+def export_bundles_command(level_id):
+    """Export levels into offline curriculum bundles."""
+    from app.services.bundle_service import BundleService
+
+    service = BundleService()
+    if level_id:
+        entry = service.export_level(level_id)
+        if not entry:
+            raise click.ClickException(f"Level {level_id} not found")
+        entries = [entry]
+    else:
+        entries = service.export_all()['bundles']
+
+    for entry in entries:
+        click.echo(f"Level {entry['level_id']}: {entry['file']} "
+                   f"({entry['size']} bytes, {entry['compressed_size']} compressed)")
+
+
+@click.command('drain-outbox')
+@click.option('--batch-size', type=int, default=50, help='Emails sent per SMTP connection.')
+@with_appcontext
+def drain_outbox_command(batch_size):
+    """Deliver every due email of the outbox."""
+    from flask import current_app
+    from app.services.email_outbox_service import EmailOutboxService
+
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = EmailOutboxService.drain(
+            batch_size=batch_size,
+            max_attempts=current_app.config.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 5),
+            backoff_seconds=current_app.config.get('EMAIL_OUTBOX_BACKOFF_SECONDS', 30)
+        )
+        total_sent += sent
+        total_failed += failed
+        if sent == 0 or failed:
+            break
+    click.echo(f"Sent {total_sent} emails, {total_failed} failed")
+
+
+@click.command('shard-uploads')
+@click.option('--batch-size', type=int, default=500, help='Files moved per transaction.')
+@with_appcontext
+def shard_uploads_command(batch_size):
+    """Move flat upload folders to the sharded layout.
+
+    Stop the app first: running servers cache content with the old paths,
+    which are removed as each batch is moved.
+    """
+    from app.services.media_service import MediaService
+
+    total = 0
+    for folder, moved in MediaService().iter_shard_uploads(batch_size=batch_size):
+        total += moved
+        click.echo(f"{folder}: moved {moved} files")
+    click.echo(f"Moved {total} files. Re-run export-bundles to refresh the offline bundles, "
+               f"then start the app.")
+
+
+@click.command('collect-media-garbage')
+@click.option('--grace-hours', type=float, default=24, help='Keep unreferenced files younger than this.')
+@click.option('--batch-size', type=int, default=1000, help='Files checked per database round trip.')
+@click.option('--dry-run', is_flag=True, help='Report what would be deleted without deleting it.')
+@with_appcontext
+def collect_media_garbage_command(grace_hours, batch_size, dry_run):
+    """Delete unreferenced uploads and report references to missing files."""
+    from app.services.media_service import MediaService
+
+    service = MediaService()
+    report = service.collect_garbage(grace_seconds=int(grace_hours * 3600), batch_size=batch_size,
+                                     dry_run=dry_run)
+    action = 'Would delete' if dry_run else 'Deleted'
+    click.echo(f"Scanned {report['scanned']} files. {action} {report['deleted']} unreferenced files "
+               f"({report['freed_bytes']} bytes).")
+
+    dangling = 0
+    for table, row_id, path in service.iter_dangling_references(batch_size=batch_size):
+        dangling += 1
+        click.echo(f"Missing file for {table} {row_id}: {path}")
+    click.echo(f"Found {dangling} references to missing files.")
+
+
+@click.command('compute-question-stats')
+@click.option('--batch-size', type=int, default=100000, help='Attempts loaded per database round trip.')
+@click.option('--min-responses', type=int, default=5, help='Responses needed to report a discrimination.')
+@with_appcontext
+def compute_question_stats_command(batch_size, min_responses):
+    """Compute question difficulty, discrimination and choice selection rates."""
+    from app.services.question_stats_service import QuestionStatsService
+
+    try:
+        report = QuestionStatsService().compute(batch_size=batch_size, min_responses=min_responses)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Computed stats of {report['questions']} questions and {report['choices']} choices from "
+               f"{report['responses']} first attempts ({report['attempts']} attempts) in {report['seconds']}s.")
+
+
+def register_commands(app):
+    """Register the CLI commands with the Flask app."""
+    app.cli.add_command(export_bundles_command)
+    app.cli.add_command(drain_outbox_command)
+    app.cli.add_command(shard_uploads_command)
+    app.cli.add_command(collect_media_garbage_command)
+    app.cli.add_command(compute_question_stats_command)
@@ -18,5 +18,62 @@ class Config:
     MAIL_DEFAULT_SENDER = 'linguazone3125@gmail.com'
 
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'uploads')
-    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
-    MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB max file size
\ No newline at end of file
+    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'mp3', 'wav', 'ogg', 'm4a'}
+    MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # 5MB max file size
+
+    # Media served from /api/media. Hash-named files are cached for a year;
+    # with USE_X_SENDFILE the web server sends the file bytes.
+    MEDIA_MAX_AGE = 3600  # seconds, for media not named by content hash
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', 'false').lower() == 'true'
+
+    # Keyset pagination for list endpoints
+    PAGE_SIZE_DEFAULT = 50
+    PAGE_SIZE_MAX = 200
+
+    # In-process cache of content GET responses
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024  # 32MB
+    RESPONSE_CACHE_TTL = 60  # seconds, bounds staleness across worker processes
+
+    # Offline curriculum bundles written by `flask export-bundles`
+    BUNDLE_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'bundles')
+
+    # Cache of user existence and role used by the auth decorators
+    USER_CACHE_TTL = 60  # seconds
+    USER_CACHE_MAX_ENTRIES = 10000
+
+    # Per-section answer keys used to grade submissions
+    ANSWER_KEY_CACHE_MAX_ENTRIES = 1000
+
+    # Fill-in-the-blank matching: scripts whose diacritics are ignored and the
+    # typos tolerated in answers of those scripts long enough to allow them (0 disables)
+    ANSWER_DIACRITIC_SCRIPTS = tuple(
+        script.strip().lower()
+        for script in os.environ.get('ANSWER_DIACRITIC_SCRIPTS', 'latin,greek,cyrillic,arabic,hebrew').split(',')
+        if script.strip()
+    )
+    ANSWER_MAX_TYPOS = int(os.environ.get('ANSWER_MAX_TYPOS', 1))
+
+    # Question ids of each section and level that quizzes are sampled from
+    QUIZ_POOL_CACHE_MAX_ENTRIES = 1000
+
+    # Password hashing runs on a bounded worker pool. The method must be fully
+    # specified (e.g. 'pbkdf2:sha256:600000' or 'scrypt:32768:8:1'); stored
+    # hashes made with other parameters are upgraded on the next login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_SALT_LENGTH = 16
+    PASSWORD_HASH_WORKERS = 4
+    PASSWORD_HASH_QUEUE_SIZE = 32
+
+    # Transactional email outbox drained by a background worker
+    EMAIL_OUTBOX_WORKER = True
+    EMAIL_OUTBOX_POLL_INTERVAL = 10  # seconds
+    EMAIL_OUTBOX_BATCH_SIZE = 50
+    EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+    EMAIL_OUTBOX_BACKOFF_SECONDS = 30
+
+    # Graded attempts are buffered in memory and flushed in batches by a
+    # background thread, which also upserts the per-section progress rows
+    PROGRESS_WRITE_BEHIND = True
+    PROGRESS_FLUSH_INTERVAL = 5  # seconds
+    PROGRESS_FLUSH_SIZE = 500  # buffered attempts
\ No newline at end of file
@@ -2,6 +2,9 @@ from app.controllers.api.auth_controller import auth_bp
 from app.controllers.api.level_controller import level_bp
 from app.controllers.api.section_controller import section_bp
 from app.controllers.api.question_controller import question_bp
+from app.controllers.api.cache_controller import cache_bp
+from app.controllers.api.media_controller import media_bp
+from app.controllers.api.review_controller import review_bp
 
-__all__ = ['auth_bp', 'level_bp', 'section_bp', 'question_bp']
+__all__ = ['auth_bp', 'level_bp', 'section_bp', 'question_bp', 'cache_bp', 'media_bp', 'review_bp']
 
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from app.services.auth_service import AuthService
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from app.utils.password_hasher import HasherBusyError
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -27,6 +28,8 @@ def register():
         }), 201
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
+    except HasherBusyError as e:
+        return jsonify({'error': str(e)}), 503
     except RuntimeError as e:
         return jsonify({'error': str(e)}), 500
     except Exception as e:
@@ -97,8 +100,9 @@ def login():
             email=data['email'],
             password=data['password']
         )
-        access_token = create_access_token(identity=result['user']['id'])
-        refresh_token = create_refresh_token(identity=result['user']['id'])
+        claims = {'role': result['user']['role']}
+        access_token = create_access_token(identity=result['user']['id'], additional_claims=claims)
+        refresh_token = create_refresh_token(identity=result['user']['id'], additional_claims=claims)
         return jsonify({
             'message': 'Login successful',
             'access_token': access_token,
@@ -107,6 +111,8 @@ def login():
         }), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 401
+    except HasherBusyError as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -164,6 +170,8 @@ def retrieve_password():
         return jsonify(result), 200
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
+    except HasherBusyError as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -173,5 +181,6 @@ def retrieve_password():
 @jwt_required(refresh=True)
 def refresh():
     current_user = get_jwt_identity()
-    new_access_token = create_access_token(identity=current_user)
+    claims = {'role': get_jwt()['role']} if 'role' in get_jwt() else None
+    new_access_token = create_access_token(identity=current_user, additional_claims=claims)
     return jsonify(access_token=new_access_token), 200
\ No newline at end of file
@@ -35,6 +35,16 @@ class BaseController:
         }
         return jsonify(response), status_code
     
+    def paginated_response(self, data: Any, next_cursor: Optional[str], message: str = "Success") -> Tuple[Dict[str, Any], int]:
+        """Build a success response for one page of a cursor-paginated list."""
+        response = {
+            'status': 'success',
+            'message': message,
+            'data': data,
+            'next_cursor': next_cursor
+        }
+        return jsonify(response), 200
+    
     def error_response(self, message: str, status_code: int = 400, errors: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], int]:
         response = {
             'status': 'error',
@@ -0,0 +1,25 @@
+from typing import Dict, Any, Tuple
+from app.controllers.api.base_controller import BaseController
+from app.utils.content_cache import response_cache
+from app.utils.auth_decorators import admin_required
+
+
+class CacheController(BaseController):
+    """Controller for monitoring the content response cache."""
+    
+    def __init__(self):
+        """Initialize the cache controller."""
+        super().__init__('cache', __name__)
+        self._register_routes()
+    
+    def _register_routes(self) -> None:
+        """Register all routes for the cache controller."""
+        self.blueprint.route('/stats', methods=['GET'], strict_slashes=False)(admin_required(self.get_stats))
+    
+    def get_stats(self) -> Tuple[Dict[str, Any], int]:
+        """ Get the hit/miss counters and size of the response cache. """
+        return self.success_response(data=response_cache.stats())
+
+
+# Create blueprint instance
+cache_bp = CacheController().blueprint
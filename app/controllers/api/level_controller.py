@@ -1,12 +1,18 @@
 from typing import Dict, Any, Tuple
-from flask import request
-from werkzeug.exceptions import BadRequest, NotFound
+from flask import current_app, request, send_from_directory
+from flask_jwt_extended import get_jwt_identity
+from werkzeug.exceptions import BadRequest, HTTPException, NotFound
 import logging
 
 from app.controllers.api.base_controller import BaseController
 from app.services.level_service import LevelService
+from app.services.bundle_service import BundleService
+from app.services.progress_service import ProgressService
+from app.services.quiz_service import QuizService, QUIZ_SIZE_DEFAULT
 from app.utils.file_upload import validate_file_upload, FileUploadError
 from app.utils.auth_decorators import token_required, admin_required
+from app.utils.pagination import get_page_args
+from app.utils.content_cache import cached_response, level_list_tags, level_tags, level_tree_tags
 
 logger = logging.getLogger(__name__)
 
@@ -17,24 +23,35 @@ class LevelController(BaseController):
         """Initialize the level controller."""
         super().__init__('level', __name__)
         self.service = LevelService()
+        self.bundle_service = BundleService()
+        self.progress_service = ProgressService()
+        self.quiz_service = QuizService()
         self._register_routes()
     
     def _register_routes(self) -> None:
         """Register all routes for the level controller."""
         # Register routes with strict_slashes=False to handle both with and without trailing slash
-        self.blueprint.route('', methods=['GET'], strict_slashes=False)(token_required(self.get_levels))
-        self.blueprint.route('/<int:level_id>', methods=['GET'], strict_slashes=False)(token_required(self.get_level))
+        self.blueprint.route('', methods=['GET'], strict_slashes=False)(token_required(cached_response(level_list_tags)(self.get_levels)))
+        self.blueprint.route('/<int:level_id>', methods=['GET'], strict_slashes=False)(token_required(cached_response(level_tags)(self.get_level)))
+        self.blueprint.route('/<int:level_id>/tree', methods=['GET'], strict_slashes=False)(token_required(cached_response(level_tree_tags)(self.get_level_tree)))
+        self.blueprint.route('/<int:level_id>/progress', methods=['GET'], strict_slashes=False)(token_required(self.get_level_progress))
+        self.blueprint.route('/<int:level_id>/quiz', methods=['GET'], strict_slashes=False)(token_required(self.get_quiz))
+        self.blueprint.route('/bundles', methods=['GET'], strict_slashes=False)(token_required(self.get_bundle_manifest))
+        self.blueprint.route('/bundles/<string:filename>', methods=['GET'], strict_slashes=False)(token_required(self.get_bundle))
         self.blueprint.route('', methods=['POST'], strict_slashes=False)(admin_required(self.create_level))
         self.blueprint.route('/<int:level_id>', methods=['PUT'], strict_slashes=False)(admin_required(self.update_level))
         self.blueprint.route('/<int:level_id>', methods=['DELETE'], strict_slashes=False)(admin_required(self.delete_level))
     
     def get_levels(self) -> Tuple[Dict[str, Any], int]:
         """
-        Get all levels.
+        Get one page of levels.
         """
         try:
-            levels = self.service.get_all()
-            return self.success_response(data=levels)
+            after_id, limit = get_page_args()
+            levels, next_cursor = self.service.get_page(after_id, limit, request.args.get('fields'))
+            return self.paginated_response(data=levels, next_cursor=next_cursor)
+        except BadRequest as e:
+            return self.error_response(e.description)
         except Exception as e:
             logger.error(f"Error getting levels: {str(e)}")
             return self.error_response("Failed to retrieve levels", status_code=500)
@@ -44,14 +61,91 @@ class LevelController(BaseController):
         Get a specific level by ID.
         """
         try:
-            level = self.service.get_by_id(level_id)
+            level = self.service.get_by_id(level_id, request.args.get('fields'))
             if not level:
                 return self.error_response("Level not found", status_code=404)
             return self.success_response(data=level)
+        except BadRequest as e:
+            return self.error_response(e.description)
         except Exception as e:
             logger.error(f"Error getting level {level_id}: {str(e)}")
             return self.error_response("Failed to retrieve level", status_code=500)
     
+    def get_level_tree(self, level_id: int) -> Tuple[Dict[str, Any], int]:
+        """
+        Get a level with its sections, questions and choices as one nested document.
+        Use ?depth=section or ?depth=question to stop at a shallower depth.
+        """
+        try:
+            depth = request.args.get('depth', 'choice')
+            tree = self.service.get_tree(level_id, depth)
+            if not tree:
+                return self.error_response("Level not found", status_code=404)
+            return self.success_response(data=tree)
+        except BadRequest as e:
+            return self.error_response(e.description)
+        except Exception as e:
+            logger.error(f"Error getting tree for level {level_id}: {str(e)}")
+            return self.error_response("Failed to retrieve level tree", status_code=500)
+    
+    def get_level_progress(self, level_id: int) -> Tuple[Dict[str, Any], int]:
+        """
+        Get the current user's progress in each section of a level.
+        """
+        try:
+            progress = self.progress_service.get_level_progress(int(get_jwt_identity()), level_id)
+            if progress is None:
+                return self.error_response("Level not found", status_code=404)
+            return self.success_response(data=progress)
+        except Exception as e:
+            logger.error(f"Error getting progress for level {level_id}: {str(e)}")
+            return self.error_response("Failed to retrieve progress", status_code=500)
+    
+    def get_quiz(self, level_id: int) -> Tuple[Dict[str, Any], int]:
+        """ Get a random quiz of ?n= questions from the level, the same on retries with the same ?seed=. """
+        size = request.args.get('n', QUIZ_SIZE_DEFAULT, type=int)
+        if size < 1:
+            return self.error_response("n must be a positive integer")
+        size = min(size, current_app.config.get('PAGE_SIZE_MAX', 200))
+        try:
+            quiz = self.quiz_service.build_quiz('level', level_id, int(get_jwt_identity()), size,
+                                               request.args.get('seed'))
+            if quiz is None:
+                return self.error_response("Level not found", status_code=404)
+            return self.success_response(data=quiz)
+        except Exception as e:
+            logger.error(f"Error building quiz for level {level_id}: {str(e)}")
+            return self.error_response("Failed to build quiz", status_code=500)
+    
+    def get_bundle_manifest(self) -> Tuple[Dict[str, Any], int]:
+        """
+        Get the manifest of the offline level bundles.
+        Clients only download bundles whose sha256 changed.
+        """
+        try:
+            return self.success_response(data=self.bundle_service.get_manifest())
+        except Exception as e:
+            logger.error(f"Error getting bundle manifest: {str(e)}")
+            return self.error_response("Failed to retrieve bundle manifest", status_code=500)
+    
+    def get_bundle(self, filename: str):
+        """
+        Download a precompressed level bundle. Bundle names contain their
+        content hash, so they can be cached forever.
+        """
+        if not filename.startswith('level-') or not filename.endswith('.json.gz'):
+            return self.error_response("Bundle not found", status_code=404)
+        try:
+            response = send_from_directory(
+                self.bundle_service.get_bundle_folder(), filename,
+                mimetype='application/json', max_age=365 * 24 * 3600
+            )
+        except NotFound:
+            return self.error_response("Bundle not found", status_code=404)
+        response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
+    
     def create_level(self) -> Tuple[Dict[str, Any], int]:
         """ Create a new level. """
         try:
@@ -81,6 +175,8 @@ class LevelController(BaseController):
         except BadRequest as e:
             logger.warning(f"Bad request while creating level: {str(e)}")
             return self.error_response(str(e))
+        except HTTPException as e:
+            return self.error_response(e.description, status_code=e.code)
         except Exception as e:
             logger.error(f"Error creating level: {str(e)}")
             return self.error_response("Failed to create level", status_code=500)
@@ -95,7 +191,7 @@ class LevelController(BaseController):
                 data = request.get_json()
                 file = None
             else:
-                data = request.form
+                data = request.form.to_dict()
                 file = request.files.get('image')
 
             if file:
@@ -115,6 +211,8 @@ class LevelController(BaseController):
         except BadRequest as e:
             logger.warning(f"Bad request while updating level {level_id}: {str(e)}")
             return self.error_response(str(e))
+        except HTTPException as e:
+            return self.error_response(e.description, status_code=e.code)
         except Exception as e:
             logger.error(f"Error updating level {level_id}: {str(e)}")
             return self.error_response("Failed to update level", status_code=500)
@@ -0,0 +1,75 @@
+import logging
+import os
+from flask import current_app, send_from_directory
+from werkzeug.exceptions import NotFound
+from app.controllers.api.base_controller import BaseController
+from app.utils.file_upload import is_content_addressed
+
+logger = logging.getLogger(__name__)
+
+# Content-addressed files never change, so they can be cached for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Media types served inline; other allowed uploads are sent as attachments
+INLINE_MIMETYPES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'gif': 'image/gif',
+    'webp': 'image/webp',
+    'mp3': 'audio/mpeg',
+    'wav': 'audio/wav',
+    'ogg': 'audio/ogg',
+    'm4a': 'audio/mp4',
+}
+
+
+class MediaController(BaseController):
+    """Controller for serving uploaded media files."""
+    
+    def __init__(self):
+        """Initialize the media controller."""
+        super().__init__('media', __name__)
+        self._register_routes()
+    
+    def _register_routes(self) -> None:
+        """Register all routes for the media controller."""
+        self.blueprint.route('/<path:path>', methods=['GET'], strict_slashes=False)(self.get_media)
+    
+    def get_media(self, path: str):
+        """
+        Serve a file stored by save_file. Accepts the stored ``uploads/...`` path
+        or the path relative to the upload folder. Supports Range requests and
+        conditional GETs; with USE_X_SENDFILE the web server sends the bytes.
+        Media is public, like the files under /static. Only the types in
+        ALLOWED_EXTENSIONS are served, and only images and audio inline, so
+        a stored file can't run as a page on the API origin.
+        """
+        if path.startswith('uploads/'):
+            path = path[len('uploads/'):]
+        file_ext = os.path.splitext(path)[1].lower().lstrip('.')
+        if file_ext not in current_app.config.get('ALLOWED_EXTENSIONS', ()):
+            return self.error_response("Media not found", status_code=404)
+
+        immutable = is_content_addressed(path)
+        max_age = IMMUTABLE_MAX_AGE if immutable else current_app.config.get('MEDIA_MAX_AGE', 3600)
+        inline_mimetype = INLINE_MIMETYPES.get(file_ext)
+        try:
+            response = send_from_directory(
+                current_app.config['UPLOAD_FOLDER'], path,
+                mimetype=inline_mimetype or 'application/octet-stream',
+                as_attachment=inline_mimetype is None,
+                conditional=True, etag=True, max_age=max_age
+            )
+        except NotFound:
+            return self.error_response("Media not found", status_code=404)
+        response.headers['X-Content-Type-Options'] = 'nosniff'
+        if inline_mimetype is None:
+            response.headers['Content-Security-Policy'] = "default-src 'none'; sandbox"
+        if immutable:
+            response.cache_control.immutable = True
+        return response
+
+
+# Create blueprint instance
+media_bp = MediaController().blueprint
@@ -1,10 +1,15 @@
 from typing import Dict, Any, Tuple
-from flask import request
-from werkzeug.exceptions import BadRequest
+import json
+from flask import current_app, request, Response, stream_with_context
+from werkzeug.exceptions import BadRequest, HTTPException
 from app.controllers.api.base_controller import BaseController
 from app.services.question_service import QuestionService
+from app.services.question_stats_service import QuestionStatsService
 from app.utils.file_upload import validate_file_upload
 from app.utils.auth_decorators import token_required, admin_required
+from app.utils.pagination import get_page_args
+from app.utils.bulk_import import detect_format, iter_import_rows
+from app.utils.content_cache import cached_response, question_list_tags, question_tags
 
 
 
@@ -15,13 +20,17 @@ class QuestionController(BaseController):
         """Initialize the question controller."""
         super().__init__('question', __name__)
         self.service = QuestionService()
+        self.stats_service = QuestionStatsService()
         self._register_routes()
     
     def _register_routes(self) -> None:
         """Register all routes for the question controller."""
         # Register routes with strict_slashes=False to handle both with and without trailing slash
-        self.blueprint.route('', methods=['GET'], strict_slashes=False)(token_required(self.get_questions))
-        self.blueprint.route('/<int:question_id>', methods=['GET'], strict_slashes=False)(token_required(self.get_question))
+        self.blueprint.route('', methods=['GET'], strict_slashes=False)(token_required(cached_response(question_list_tags)(self.get_questions)))
+        self.blueprint.route('/<int:question_id>', methods=['GET'], strict_slashes=False)(token_required(cached_response(question_tags)(self.get_question)))
+        self.blueprint.route('/export', methods=['GET'], strict_slashes=False)(admin_required(self.export_questions))
+        self.blueprint.route('/stats', methods=['GET'], strict_slashes=False)(admin_required(self.get_question_stats))
+        self.blueprint.route('/import', methods=['POST'], strict_slashes=False)(admin_required(self.import_questions))
         self.blueprint.route('', methods=['POST'], strict_slashes=False)(admin_required(self.create_question))
         self.blueprint.route('/<int:question_id>', methods=['PUT'], strict_slashes=False)(admin_required(self.update_question))
         self.blueprint.route('/<int:question_id>', methods=['DELETE'], strict_slashes=False)(admin_required(self.delete_question))
@@ -30,18 +39,96 @@ class QuestionController(BaseController):
         self.blueprint.route('/<int:question_id>/choices/<int:choice_id>', methods=['PUT'], strict_slashes=False)(admin_required(self.update_choice))
     
     def get_questions(self) -> Tuple[Dict[str, Any], int]:
-        """ Get all questions or filter by section. """
+        """ Get one page of questions, optionally filtered by section and/or level. """
         section_id = request.args.get('section_id', type=int)
-        questions = self.service.get_questions_by_section(section_id) if section_id else self.service.get_all()
-        return self.success_response(data=[question.to_dict() for question in questions])
+        level_id = request.args.get('level_id', type=int)
+        try:
+            after_id, limit = get_page_args()
+            questions, next_cursor = self.service.get_page_with_choices(
+                section_id, level_id, after_id, limit, request.args.get('fields'))
+        except BadRequest as e:
+            return self.error_response(e.description)
+        return self.paginated_response(data=[question.to_dict() for question in questions], next_cursor=next_cursor)
     
     def get_question(self, question_id: int) -> Tuple[Dict[str, Any], int]:
         """ Get a specific question by ID. """
-        question = self.service.get_by_id(question_id)
+        try:
+            question = self.service.get_by_id_with_choices(question_id, request.args.get('fields'))
+        except BadRequest as e:
+            return self.error_response(e.description)
         if not question:
             return self.error_response("Question not found", status_code=404)
         return self.success_response(data=question.to_dict())
     
+    def get_question_stats(self) -> Tuple[Dict[str, Any], int]:
+        """
+        Get one page of question difficulty and discrimination stats with the
+        selection rates of their choices, optionally filtered by section and/or level.
+        The stats are computed by the compute-question-stats command.
+        """
+        section_id = request.args.get('section_id', type=int)
+        level_id = request.args.get('level_id', type=int)
+        try:
+            after_id, limit = get_page_args()
+            stats, next_cursor = self.stats_service.get_page(section_id, level_id, after_id, limit)
+        except BadRequest as e:
+            return self.error_response(e.description)
+        return self.paginated_response(data=stats, next_cursor=next_cursor)
+    
+    def export_questions(self) -> Response:
+        """
+        Export questions with their choices as newline-delimited JSON,
+        optionally filtered by section and/or level. Rows are streamed
+        from the database, so memory stays constant.
+        """
+        section_id = request.args.get('section_id', type=int)
+        level_id = request.args.get('level_id', type=int)
+
+        def generate():
+            for question in self.service.iter_export(section_id, level_id):
+                yield json.dumps(question.to_dict(), ensure_ascii=False) + '\n'
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson',
+            headers={'Content-Disposition': 'attachment; filename=questions.ndjson'}
+        )
+    
+    def import_questions(self) -> Tuple[Dict[str, Any], int]:
+        """
+        Import questions with their choices from a JSON array, NDJSON or CSV
+        document, sent either as the request body or as a ``file`` upload.
+        The document is parsed as a stream. With ``?partial=true`` valid rows
+        are imported and invalid rows reported; otherwise any invalid row
+        aborts the whole import.
+        """
+        try:
+            upload = request.files.get('file')
+            if upload:
+                fmt = detect_format(upload.filename, upload.mimetype, request.args.get('format'))
+                stream = upload.stream
+            else:
+                fmt = detect_format(None, request.mimetype, request.args.get('format'))
+                stream = request.stream
+            partial = request.args.get('partial', 'false').lower() == 'true'
+
+            result = self.service.import_questions(iter_import_rows(stream, fmt), partial=partial)
+            if result['failed'] and not partial:
+                return self.error_response(
+                    f"Import aborted: {result['failed']} invalid rows",
+                    errors=result['errors']
+                )
+            return self.success_response(
+                data=result,
+                message=f"Imported {result['imported']} questions",
+                status_code=201 if result['imported'] else 200
+            )
+        except BadRequest as e:
+            return self.error_response(e.description)
+        except Exception:
+            current_app.logger.exception("Error importing questions")
+            return self.error_response("Failed to import questions", status_code=500)
+    
     def create_question(self) -> Tuple[Dict[str, Any], int]:
         """ Create a new question. """
         try:
@@ -64,6 +151,8 @@ class QuestionController(BaseController):
             )
         except BadRequest as e:
             return self.error_response(str(e))
+        except HTTPException as e:
+            return self.error_response(e.description, status_code=e.code)
         except Exception as e:
             print("Error creating question:", e)
             return self.error_response("Failed to create question", status_code=500)
@@ -76,7 +165,7 @@ class QuestionController(BaseController):
                 data = request.get_json()
                 question_file = None
             else:
-                data = request.form
+                data = request.form.to_dict()
                 question_file = request.files.get('question_content')
 
             if question_file:
@@ -92,6 +181,8 @@ class QuestionController(BaseController):
             )
         except BadRequest as e:
             return self.error_response(str(e))
+        except HTTPException as e:
+            return self.error_response(e.description, status_code=e.code)
         except Exception as e:
             return self.error_response("Failed to update question", status_code=500)
     
@@ -119,6 +210,8 @@ class QuestionController(BaseController):
             return self.success_response(data=choice.to_dict(), message="Choice added successfully")
         except BadRequest as e:
             return self.error_response(str(e))
+        except HTTPException as e:
+            return self.error_response(e.description, status_code=e.code)
         except Exception as e:
             return self.error_response("Failed to add choice", status_code=500)
 
@@ -150,6 +243,8 @@ class QuestionController(BaseController):
             return self.success_response(data=choice.to_dict(), message="Choice updated successfully")
         except BadRequest as e:
             return self.error_response(str(e))
+        except HTTPException as e:
+            return self.error_response(e.description, status_code=e.code)
         except Exception as e:
             return self.error_response("Failed to update choice", status_code=500)
 
@@ -0,0 +1,43 @@
+from typing import Dict, Any, Tuple
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from app.controllers.api.base_controller import BaseController
+from app.services.review_service import ReviewService
+from app.utils.auth_decorators import token_required
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Default number of questions in a review feed
+REVIEW_LIMIT_DEFAULT = 20
+
+
+class ReviewController(BaseController):
+    """Controller for the spaced-repetition review feed."""
+    
+    def __init__(self):
+        """Initialize the review controller."""
+        super().__init__('review', __name__)
+        self.service = ReviewService()
+        self._register_routes()
+    
+    def _register_routes(self) -> None:
+        """Register all routes for the review controller."""
+        self.blueprint.route('/next', methods=['GET'], strict_slashes=False)(token_required(self.get_next))
+    
+    def get_next(self) -> Tuple[Dict[str, Any], int]:
+        """ Get the current user's questions due for review, most overdue first. """
+        limit = request.args.get('limit', REVIEW_LIMIT_DEFAULT, type=int)
+        if limit < 1:
+            return self.error_response("Limit must be a positive integer")
+        limit = min(limit, current_app.config.get('PAGE_SIZE_MAX', 200))
+        try:
+            items = self.service.get_due(int(get_jwt_identity()), limit)
+            return self.success_response(data=items)
+        except Exception as e:
+            logger.error(f"Error getting review feed: {str(e)}")
+            return self.error_response("Failed to retrieve review feed", status_code=500)
+
+
+# Create blueprint instance
+review_bp = ReviewController().blueprint
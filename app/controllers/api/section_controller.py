@@ -1,10 +1,15 @@
 from typing import Dict, Any, Tuple
-from flask import request
-from werkzeug.exceptions import BadRequest
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from werkzeug.exceptions import BadRequest, HTTPException
 from app.controllers.api.base_controller import BaseController
 from app.services.section_service import SectionService
+from app.services.grading_service import GradingService
+from app.services.quiz_service import QuizService, QUIZ_SIZE_DEFAULT
 from app.utils.file_upload import validate_file_upload
 from app.utils.auth_decorators import token_required, admin_required
+from app.utils.pagination import get_page_args
+from app.utils.content_cache import cached_response, section_list_tags, section_tags
 
 
 class SectionController(BaseController):
@@ -14,26 +19,37 @@ class SectionController(BaseController):
         """Initialize the section controller."""
         super().__init__('section', __name__)
         self.service = SectionService()
+        self.grading_service = GradingService()
+        self.quiz_service = QuizService()
         self._register_routes()
     
     def _register_routes(self) -> None:
         """Register all routes for the section controller."""
         # Register routes with strict_slashes=False to handle both with and without trailing slash
-        self.blueprint.route('', methods=['GET'], strict_slashes=False)(token_required(self.get_sections))
-        self.blueprint.route('/<int:section_id>', methods=['GET'], strict_slashes=False)(token_required(self.get_section))
+        self.blueprint.route('', methods=['GET'], strict_slashes=False)(token_required(cached_response(section_list_tags)(self.get_sections)))
+        self.blueprint.route('/<int:section_id>', methods=['GET'], strict_slashes=False)(token_required(cached_response(section_tags)(self.get_section)))
         self.blueprint.route('', methods=['POST'], strict_slashes=False)(admin_required(self.create_section))
         self.blueprint.route('/<int:section_id>', methods=['PUT'], strict_slashes=False)(admin_required(self.update_section))
         self.blueprint.route('/<int:section_id>', methods=['DELETE'], strict_slashes=False)(admin_required(self.delete_section))
+        self.blueprint.route('/<int:section_id>/submit', methods=['POST'], strict_slashes=False)(token_required(self.submit_answers))
+        self.blueprint.route('/<int:section_id>/quiz', methods=['GET'], strict_slashes=False)(token_required(self.get_quiz))
     
     def get_sections(self) -> Tuple[Dict[str, Any], int]:
-        """ Get all sections or filter by level. """
+        """ Get one page of sections, optionally filtered by level. """
         level_id = request.args.get('level_id', type=int)
-        sections = self.service.get_sections_by_level(level_id) if level_id else self.service.get_all()
-        return self.success_response(data=[section.to_dict() for section in sections])
+        try:
+            after_id, limit = get_page_args()
+            sections, next_cursor = self.service.get_page(level_id, after_id, limit, request.args.get('fields'))
+        except BadRequest as e:
+            return self.error_response(e.description)
+        return self.paginated_response(data=[section.to_dict() for section in sections], next_cursor=next_cursor)
     
     def get_section(self, section_id: int) -> Tuple[Dict[str, Any], int]:
         """ Get a specific section by ID. """
-        section = self.service.get_by_id(section_id)
+        try:
+            section = self.service.get_view(section_id, request.args.get('fields'))
+        except BadRequest as e:
+            return self.error_response(e.description)
         if not section:
             return self.error_response("Section not found", status_code=404)
         return self.success_response(data=section.to_dict())
@@ -61,6 +77,8 @@ class SectionController(BaseController):
             )
         except BadRequest as e:
             return self.error_response(str(e))
+        except HTTPException as e:
+            return self.error_response(e.description, status_code=e.code)
         except Exception as e:
             return self.error_response("Failed to create section", status_code=500)
     
@@ -88,6 +106,8 @@ class SectionController(BaseController):
             )
         except BadRequest as e:
             return self.error_response(str(e))
+        except HTTPException as e:
+            return self.error_response(e.description, status_code=e.code)
         except Exception as e:
             return self.error_response("Failed to update section", status_code=500)
     
@@ -100,6 +120,36 @@ class SectionController(BaseController):
         except Exception as e:
             return self.error_response("Failed to delete section", status_code=500)
 
+    def submit_answers(self, section_id: int) -> Tuple[Dict[str, Any], int]:
+        """ Grade a batch of answers to the questions of a section. """
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or 'answers' not in data:
+            return self.error_response("Missing required field: answers")
+        try:
+            result = self.grading_service.grade_section(section_id, data['answers'], int(get_jwt_identity()))
+            if result is None:
+                return self.error_response("Section not found", status_code=404)
+            return self.success_response(data=result, message="Answers graded successfully")
+        except BadRequest as e:
+            return self.error_response(e.description)
+        except Exception as e:
+            return self.error_response("Failed to grade answers", status_code=500)
+
+    def get_quiz(self, section_id: int) -> Tuple[Dict[str, Any], int]:
+        """ Get a random quiz of ?n= questions from the section, the same on retries with the same ?seed=. """
+        size = request.args.get('n', QUIZ_SIZE_DEFAULT, type=int)
+        if size < 1:
+            return self.error_response("n must be a positive integer")
+        size = min(size, current_app.config.get('PAGE_SIZE_MAX', 200))
+        try:
+            quiz = self.quiz_service.build_quiz('section', section_id, int(get_jwt_identity()), size,
+                                               request.args.get('seed'))
+            if quiz is None:
+                return self.error_response("Section not found", status_code=404)
+            return self.success_response(data=quiz)
+        except Exception as e:
+            return self.error_response("Failed to build quiz", status_code=500)
+
 
 # Create blueprint instance
 section_bp = SectionController().blueprint
@@ -2,5 +2,12 @@ from app.models.user import User, UserRole
 from app.models.level import Level
 from app.models.section import Section
 from app.models.question import Question, QuestionChoice
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from app.models.media_object import MediaObject
+from app.models.progress import QuestionAttempt, SectionProgress
+from app.models.review_item import ReviewItem
+from app.models.question_stats import QuestionStats, ChoiceStats
 
-__all__ = ['User', 'UserRole', 'Level', 'Section', 'Question', 'QuestionChoice']
\ No newline at end of file
+__all__ = ['User', 'UserRole', 'Level', 'Section', 'Question', 'QuestionChoice', 'EmailOutbox', 'OutboxStatus',
+           'MediaObject', 'QuestionAttempt', 'SectionProgress',
+           'ReviewItem', 'QuestionStats', 'ChoiceStats']
\ No newline at end of file
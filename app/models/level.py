@@ -12,7 +12,8 @@ class Level(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
-    sections = db.relationship('Section', back_populates='level', lazy=True, cascade='all, delete-orphan')
+    sections = db.relationship('Section', back_populates='level', lazy=True, cascade='all, delete-orphan',
+                               passive_deletes=True)
 
     def to_dict(self):
         return {
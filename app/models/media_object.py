@@ -0,0 +1,14 @@
+from app import db
+from datetime import datetime
+
+class MediaObject(db.Model):
+    __tablename__ = 'media_objects'
+
+    id = db.Column(db.Integer, primary_key=True)
+    path = db.Column(db.String(255), unique=True, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    size = db.Column(db.BigInteger, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<MediaObject {self.path} ({self.ref_count} refs)>'
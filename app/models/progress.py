@@ -0,0 +1,46 @@
+from app import db
+from datetime import datetime
+
+class QuestionAttempt(db.Model):
+    __tablename__ = 'question_attempts'
+    __table_args__ = (
+        db.Index('ix_question_attempts_user_id_section_id', 'user_id', 'section_id'),
+        db.Index('ix_question_attempts_question_id', 'question_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    section_id = db.Column(db.Integer, db.ForeignKey('sections.id', ondelete='CASCADE'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id', ondelete='CASCADE'), nullable=False)
+    # The selected choice when exactly one was submitted
+    choice_id = db.Column(db.Integer, db.ForeignKey('question_choices.id', ondelete='SET NULL'), nullable=True)
+    answer = db.Column(db.String(255), nullable=True)
+    is_correct = db.Column(db.Boolean, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<QuestionAttempt {self.id} by user {self.user_id}>'
+
+class SectionProgress(db.Model):
+    __tablename__ = 'section_progress'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    section_id = db.Column(db.Integer, db.ForeignKey('sections.id', ondelete='CASCADE'), primary_key=True)
+    submissions = db.Column(db.Integer, nullable=False, default=0)
+    attempted = db.Column(db.Integer, nullable=False, default=0)
+    correct = db.Column(db.Integer, nullable=False, default=0)
+    best_score = db.Column(db.Float, nullable=False, default=0)
+    last_activity_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'section_id': self.section_id,
+            'submissions': self.submissions,
+            'attempted': self.attempted,
+            'correct': self.correct,
+            'best_score': self.best_score,
+            'last_activity_at': self.last_activity_at.isoformat() if self.last_activity_at else None
+        }
+
+    def __repr__(self):
+        return f'<SectionProgress user {self.user_id} section {self.section_id}>'
@@ -20,17 +20,21 @@ class Question(db.Model):
     __tablename__ = 'questions'
 
     id = db.Column(db.Integer, primary_key=True)
-    section_id = db.Column(db.Integer, db.ForeignKey('sections.id'), nullable=False)
+    section_id = db.Column(db.Integer, db.ForeignKey('sections.id', ondelete='CASCADE'), nullable=False)
     section = db.relationship('Section', back_populates='questions')
     question_type = db.Column(db.Enum(QuestionType), nullable=False)
     question_content = db.Column(db.String(255), nullable=False)
     answer_type = db.Column(db.Enum(AnswerType), nullable=False)
     correct_answer = db.Column(db.String(255), nullable=True)
+    # Tags the rows of an import batch until their ids are read back, on
+    # databases without INSERT ... RETURNING
+    import_token = db.Column(db.String(48), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
-    choices = db.relationship('QuestionChoice', back_populates='question', cascade='all, delete-orphan')
+    choices = db.relationship('QuestionChoice', back_populates='question', cascade='all, delete-orphan',
+                              passive_deletes=True)
 
     def to_dict(self):
         return {
@@ -55,7 +59,7 @@ class QuestionChoice(db.Model):
     __tablename__ = 'question_choices'
 
     id = db.Column(db.Integer, primary_key=True)
-    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id', ondelete='CASCADE'), nullable=False)
     choice_type = db.Column(db.Enum(ChoiceType), nullable=False)
     content = db.Column(db.String(255), nullable=False)
     is_correct = db.Column(db.Boolean, default=False)
@@ -0,0 +1,33 @@
+from app import db
+from datetime import datetime
+
+class QuestionStats(db.Model):
+    __tablename__ = 'question_stats'
+
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id', ondelete='CASCADE'), primary_key=True)
+    # Learners counted, by their first attempt at the question
+    responses = db.Column(db.Integer, nullable=False)
+    # Share of correct first attempts
+    p_value = db.Column(db.Float, nullable=False)
+    # Point-biserial correlation with the learners' score on their other questions
+    discrimination = db.Column(db.Float, nullable=True)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<QuestionStats question {self.question_id}>'
+
+class ChoiceStats(db.Model):
+    __tablename__ = 'choice_stats'
+    __table_args__ = (
+        db.Index('ix_choice_stats_question_id', 'question_id'),
+    )
+
+    choice_id = db.Column(db.Integer, db.ForeignKey('question_choices.id', ondelete='CASCADE'), primary_key=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id', ondelete='CASCADE'), nullable=False)
+    selections = db.Column(db.Integer, nullable=False)
+    # Share of the question's single-choice first attempts that selected this choice
+    selection_rate = db.Column(db.Float, nullable=False)
+    computed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ChoiceStats choice {self.choice_id}>'
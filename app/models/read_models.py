@@ -0,0 +1,221 @@
+"""
+Lightweight read models for the content GET endpoints.
+
+Views are built straight from SQLAlchemy Core rows, so read-only requests skip
+the identity map and change tracking of full ORM entities. Enum values and
+timestamps are converted once, when the view is built, and ``to_dict()``
+returns the same document as the ORM model's ``to_dict()``.
+
+A view can be restricted to a subset of its fields (sparse fieldsets); only the
+columns backing those fields are selected.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from werkzeug.exceptions import BadRequest
+
+from app import db
+from app.models.level import Level
+from app.models.section import Section
+from app.models.question import Question, QuestionChoice
+
+# Maximum number of ids bound into one IN clause
+IN_CHUNK_SIZE = 500
+
+# Number of rows fetched per round trip when streaming
+STREAM_YIELD_PER = 1000
+
+
+def _isoformat(value) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _enum_value(value) -> Optional[str]:
+    return value.value if value is not None else None
+
+
+class _View:
+    __slots__ = ('fields',)
+    # Output fields in document order
+    FIELDS: Tuple[str, ...] = ()
+    # Columns backing each field
+    COLUMNS: Dict[str, Any] = {}
+    # Columns always loaded, whether or not they are output
+    KEYS: Tuple[str, ...] = ('id',)
+    # Conversions applied once when the view is built
+    CONVERTERS: Dict[str, Any] = {'created_at': _isoformat, 'updated_at': _isoformat}
+
+    def __init__(self, row, fields: Optional[Tuple[str, ...]] = None, prefix: str = ''):
+        self.fields = fields or self.FIELDS
+        for name in self._loaded(self.fields):
+            value = getattr(row, prefix + name)
+            converter = self.CONVERTERS.get(name)
+            setattr(self, name, converter(value) if converter else value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.fields}
+
+    @classmethod
+    def parse_fields(cls, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+        """
+        Parse a comma-separated ``fields`` query parameter.
+        Returns the requested fields in document order, or None for all fields.
+        """
+        if not fields:
+            return None
+        requested = {field.strip() for field in fields.split(',') if field.strip()}
+        unknown = requested - set(cls.FIELDS)
+        if unknown:
+            raise BadRequest(f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                             f"Allowed fields: {', '.join(cls.FIELDS)}")
+        return tuple(field for field in cls.FIELDS if field in requested)
+
+    @classmethod
+    def _loaded(cls, fields: Sequence[str]) -> List[str]:
+        names = list(cls.KEYS)
+        names += [field for field in fields if field in cls.COLUMNS and field not in names]
+        return names
+
+    @classmethod
+    def columns(cls, fields: Optional[Tuple[str, ...]] = None, prefix: str = '') -> List[Any]:
+        """Get the columns backing the given fields, labelled with ``prefix`` when given."""
+        names = cls._loaded(fields or cls.FIELDS)
+        if prefix:
+            return [cls.COLUMNS[name].label(prefix + name) for name in names]
+        return [cls.COLUMNS[name] for name in names]
+
+    @classmethod
+    def select(cls, fields: Optional[Tuple[str, ...]] = None):
+        """Build a select of only the columns backing the given fields."""
+        return select(*cls.columns(fields))
+
+    @classmethod
+    def fetch(cls, stmt, fields: Optional[Tuple[str, ...]] = None) -> List["_View"]:
+        """Execute a select built with ``select()`` and wrap every row."""
+        return [cls(row, fields) for row in db.session.execute(stmt)]
+
+
+class LevelView(_View):
+    __slots__ = ('id', 'name', 'description', 'image_url', 'created_at', 'updated_at')
+    FIELDS = __slots__
+    COLUMNS = {
+        'id': Level.id,
+        'name': Level.name,
+        'description': Level.description,
+        'image_url': Level.image_url,
+        'created_at': Level.created_at,
+        'updated_at': Level.updated_at
+    }
+
+
+class SectionView(_View):
+    __slots__ = ('id', 'name', 'description', 'image', 'level_id', 'created_at', 'updated_at')
+    FIELDS = __slots__
+    COLUMNS = {
+        'id': Section.id,
+        'name': Section.name,
+        'description': Section.description,
+        'image': Section.image,
+        'level_id': Section.level_id,
+        'created_at': Section.created_at,
+        'updated_at': Section.updated_at
+    }
+
+
+class ChoiceView(_View):
+    __slots__ = ('id', 'question_id', 'choice_type', 'content', 'is_correct', 'created_at', 'updated_at')
+    FIELDS = ('id', 'choice_type', 'content', 'is_correct', 'created_at', 'updated_at')
+    COLUMNS = {
+        'id': QuestionChoice.id,
+        'question_id': QuestionChoice.question_id,
+        'choice_type': QuestionChoice.choice_type,
+        'content': QuestionChoice.content,
+        'is_correct': QuestionChoice.is_correct,
+        'created_at': QuestionChoice.created_at,
+        'updated_at': QuestionChoice.updated_at
+    }
+    KEYS = ('id', 'question_id')
+    CONVERTERS = {**_View.CONVERTERS, 'choice_type': _enum_value}
+
+
+class QuestionView(_View):
+    __slots__ = ('id', 'section_id', 'question_type', 'question_content', 'answer_type', 'correct_answer',
+                 'choices', 'created_at', 'updated_at')
+    FIELDS = __slots__
+    COLUMNS = {
+        'id': Question.id,
+        'section_id': Question.section_id,
+        'question_type': Question.question_type,
+        'question_content': Question.question_content,
+        'answer_type': Question.answer_type,
+        'correct_answer': Question.correct_answer,
+        'created_at': Question.created_at,
+        'updated_at': Question.updated_at
+    }
+    CONVERTERS = {**_View.CONVERTERS, 'question_type': _enum_value, 'answer_type': _enum_value}
+
+    def __init__(self, row, fields: Optional[Tuple[str, ...]] = None, prefix: str = ''):
+        super().__init__(row, fields, prefix)
+        self.choices = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        if 'choices' in data:
+            data['choices'] = [choice.to_dict() for choice in self.choices]
+        return data
+
+    @property
+    def wants_choices(self) -> bool:
+        return 'choices' in self.fields
+
+
+def attach_choices(questions: Iterable[QuestionView], choices: Optional[Iterable[ChoiceView]] = None) -> None:
+    """
+    Attach choices to the questions whose fields include them. When ``choices``
+    is not given they are loaded with one IN query per IN_CHUNK_SIZE questions.
+    """
+    by_id = {question.id: question for question in questions if question.wants_choices}
+    if not by_id:
+        return
+
+    if choices is None:
+        ids = list(by_id)
+        choices = []
+        for start in range(0, len(ids), IN_CHUNK_SIZE):
+            choices += ChoiceView.fetch(
+                ChoiceView.select()
+                .where(QuestionChoice.question_id.in_(ids[start:start + IN_CHUNK_SIZE]))
+                .order_by(QuestionChoice.id)
+            )
+
+    for choice in choices:
+        question = by_id.get(choice.question_id)
+        if question is not None:
+            question.choices.append(choice)
+
+
+def stream_questions(*criteria, order_by: Sequence[Any] = (Question.id,),
+                     yield_per: int = STREAM_YIELD_PER) -> Iterator[QuestionView]:
+    """
+    Stream questions with their choices from a single query over questions
+    joined with their choices, using a server-side cursor. ``criteria`` may
+    filter on Question or Section columns. Memory stays constant no matter
+    how many rows are streamed.
+    """
+    stmt = (
+        select(*QuestionView.columns(), *ChoiceView.columns(prefix='choice_'))
+        .join(Section, Question.section_id == Section.id)
+        .outerjoin(QuestionChoice, QuestionChoice.question_id == Question.id)
+        .where(*criteria)
+        .order_by(*order_by, QuestionChoice.id)
+        .execution_options(yield_per=yield_per)
+    )
+    question = None
+    for row in db.session.execute(stmt):
+        if question is None or question.id != row.id:
+            if question is not None:
+                yield question
+            question = QuestionView(row)
+        if row.choice_id is not None:
+            question.choices.append(ChoiceView(row, prefix='choice_'))
+    if question is not None:
+        yield question
@@ -0,0 +1,31 @@
+from app import db
+from datetime import datetime
+
+class ReviewItem(db.Model):
+    __tablename__ = 'review_items'
+    __table_args__ = (
+        db.Index('ix_review_items_user_id_due_at', 'user_id', 'due_at'),
+    )
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id', ondelete='CASCADE'), primary_key=True)
+    ease = db.Column(db.Float, nullable=False, default=2.5)
+    interval_days = db.Column(db.Integer, nullable=False, default=0)
+    repetitions = db.Column(db.Integer, nullable=False, default=0)
+    lapses = db.Column(db.Integer, nullable=False, default=0)
+    due_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_reviewed_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'question_id': self.question_id,
+            'ease': self.ease,
+            'interval_days': self.interval_days,
+            'repetitions': self.repetitions,
+            'lapses': self.lapses,
+            'due_at': self.due_at.isoformat() if self.due_at else None,
+            'last_reviewed_at': self.last_reviewed_at.isoformat() if self.last_reviewed_at else None
+        }
+
+    def __repr__(self):
+        return f'<ReviewItem user {self.user_id} question {self.question_id}>'
@@ -8,13 +8,14 @@ class Section(db.Model):
     name = db.Column(db.String(100), unique=True, nullable=False)
     description = db.Column(db.Text, nullable=True)
     image = db.Column(db.String(255), nullable=True)
-    level_id = db.Column(db.Integer, db.ForeignKey('levels.id'), nullable=False)
+    level_id = db.Column(db.Integer, db.ForeignKey('levels.id', ondelete='CASCADE'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     level = db.relationship('Level', back_populates='sections')
-    questions = db.relationship('Question', back_populates='section', lazy=True, cascade='all, delete-orphan')
+    questions = db.relationship('Question', back_populates='section', lazy=True, cascade='all, delete-orphan',
+                                passive_deletes=True)
 
     def to_dict(self):
         return {
@@ -1,7 +1,12 @@
 from app import db
 from app.models.user import User
-from app.utils.email import send_verification_email, send_password_reset_email
+from app.utils.email import (
+    VERIFICATION_EMAIL_SUBJECT, PASSWORD_RESET_EMAIL_SUBJECT,
+    verification_email_html, password_reset_email_html
+)
+from app.services.email_outbox_service import EmailOutboxService, outbox_worker
 from app.utils.helpers import generate_verification_code
+from app.utils.user_cache import user_cache
 from flask_jwt_extended import create_access_token, create_refresh_token
 from datetime import datetime, timedelta
 from werkzeug.security import check_password_hash
@@ -25,8 +30,8 @@ class AuthService:
         db.session.add(user)
         db.session.commit()
 
-        # Create access token
-        access_token = create_access_token(identity=user.id)
+        # Create access token with the role claim
+        access_token = create_access_token(identity=user.id, additional_claims={'role': user.role.value})
         
         return {
             'access_token': access_token,
@@ -76,10 +81,10 @@ class AuthService:
         user.verification_code = verification_code
         user.verification_code_expires = datetime.utcnow() + timedelta(minutes=30)
         
-        if not send_verification_email(user.email, verification_code):
-            raise RuntimeError('Failed to send verification email')
-            
+        # Queued in the same transaction as the new code, delivered in the background
+        EmailOutboxService.enqueue(user.email, VERIFICATION_EMAIL_SUBJECT, verification_email_html(verification_code))
         db.session.commit()
+        outbox_worker.notify()
         return {'message': 'New verification code sent successfully'}
 
     @staticmethod
@@ -100,8 +105,13 @@ class AuthService:
         if not user or not user.check_password(password):
             raise ValueError("Invalid email or password")
 
-        # Create access token
-        access_token = create_access_token(identity=user.id)
+        # Upgrade the stored hash to the current method and cost
+        if user.password_needs_rehash():
+            user.set_password(password)
+            db.session.commit()
+
+        # Create access token with the role claim
+        access_token = create_access_token(identity=user.id, additional_claims={'role': user.role.value})
         
         return {
             'access_token': access_token,
@@ -121,6 +131,7 @@ class AuthService:
             
         db.session.delete(user)
         db.session.commit()
+        user_cache.invalidate(user.id)
         
         return {
             'deleted_user': {
@@ -139,10 +150,10 @@ class AuthService:
         user.verification_code = verification_code
         user.verification_code_expires = datetime.utcnow() + timedelta(minutes=30)
         
-        if not send_password_reset_email(user.email, verification_code):
-            raise RuntimeError('Failed to send verification email')
-
+        # Queued in the same transaction as the new code, delivered in the background
+        EmailOutboxService.enqueue(user.email, PASSWORD_RESET_EMAIL_SUBJECT, password_reset_email_html(verification_code))
         db.session.commit()
+        outbox_worker.notify()
         return {'message': 'Verification code sent to your email'}
 
     @staticmethod
@@ -0,0 +1,166 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from flask import current_app
+from sqlalchemy import select
+
+from app import db
+from app.models.level import Level
+from app.models.section import Section
+from app.models.question import Question
+from app.models.read_models import SectionView, stream_questions
+import logging
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class _BundleWriter:
+    """Write the uncompressed JSON through gzip while hashing it."""
+
+    def __init__(self, fileobj):
+        self.gzip = gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=9, mtime=0)
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        self.gzip.write(chunk)
+        self.sha256.update(chunk)
+        self.size += len(chunk)
+
+    def close(self) -> None:
+        self.gzip.close()
+
+
+class BundleService:
+    """Export levels into gzip-compressed, content-hash-named offline bundles."""
+
+    # Number of question/choice rows fetched per round trip while exporting
+    YIELD_PER = 1000
+
+    def get_bundle_folder(self) -> str:
+        folder = current_app.config.get('BUNDLE_FOLDER') or os.path.join(current_app.instance_path, 'bundles')
+        os.makedirs(folder, exist_ok=True)
+        return folder
+
+    def get_manifest(self) -> Dict[str, Any]:
+        """ Get the manifest of the exported bundles. """
+        manifest_path = os.path.join(self.get_bundle_folder(), MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            return {'generated_at': None, 'bundles': []}
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def export_all(self) -> Dict[str, Any]:
+        """
+        Export every level into a bundle and rewrite the manifest.
+        Bundles of levels that no longer exist are removed.
+        """
+        entries = []
+        for level in db.session.execute(select(Level).order_by(Level.id)).scalars().all():
+            entries.append(self._export_level(level))
+        manifest = self._write_manifest(entries)
+        self._remove_stale_bundles({entry['file'] for entry in entries})
+        return manifest
+
+    def export_level(self, level_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Export a single level into a bundle and update its manifest entry.
+        """
+        level = Level.query.get(level_id)
+        if not level:
+            return None
+        entry = self._export_level(level)
+        entries = [e for e in self.get_manifest()['bundles'] if e['level_id'] != level_id]
+        entries.append(entry)
+        self._write_manifest(sorted(entries, key=lambda e: e['level_id']))
+        self._remove_stale_bundles({e['file'] for e in entries})
+        return entry
+
+    def _export_level(self, level: Level) -> Dict[str, Any]:
+        folder = self.get_bundle_folder()
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                writer = _BundleWriter(f)
+                for chunk in self._iter_level_json(level):
+                    writer.write(chunk)
+                writer.close()
+
+            content_hash = writer.sha256.hexdigest()
+            filename = f"level-{level.id}-{content_hash[:16]}.json.gz"
+            final_path = os.path.join(folder, filename)
+            if os.path.exists(final_path):
+                # Content did not change since the last export
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, final_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        logger.info(f"Exported level {level.id} to bundle {filename}")
+        return {
+            'level_id': level.id,
+            'name': level.name,
+            'file': filename,
+            'sha256': content_hash,
+            'size': writer.size,
+            'compressed_size': os.path.getsize(final_path),
+            'updated_at': level.updated_at.isoformat() if level.updated_at else None
+        }
+
+    def _iter_level_json(self, level: Level) -> Iterator[bytes]:
+        """
+        Yield the JSON document of a level piece by piece. Questions and choices
+        are streamed from a single ordered query so memory stays flat.
+        """
+        sections = SectionView.fetch(
+            SectionView.select().where(Section.level_id == level.id).order_by(Section.id)
+        )
+        questions = stream_questions(Section.level_id == level.id,
+                                     order_by=(Question.section_id, Question.id),
+                                     yield_per=self.YIELD_PER)
+        question = next(questions, None)
+
+        yield b'{"level":' + _dumps(level.to_dict()) + b',"sections":['
+        for section_index, section in enumerate(sections):
+            section_data = section.to_dict()
+            section_data['questions'] = []
+            header = _dumps(section_data)[:-2]  # strip the empty list and closing brace
+            yield (b',' if section_index else b'') + header
+
+            question_index = 0
+            while question is not None and question.section_id == section.id:
+                yield (b',' if question_index else b'') + _dumps(question.to_dict())
+                question_index += 1
+                question = next(questions, None)
+            yield b']}'
+        yield b']}'
+
+    def _write_manifest(self, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        folder = self.get_bundle_folder()
+        manifest = {'generated_at': datetime.utcnow().isoformat(), 'bundles': entries}
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(folder, MANIFEST_NAME))
+        return manifest
+
+    def _remove_stale_bundles(self, keep: set) -> None:
+        folder = self.get_bundle_folder()
+        for entry in os.scandir(folder):
+            if entry.name.startswith('level-') and entry.name.endswith('.json.gz') and entry.name not in keep:
+                os.remove(entry.path)
+                logger.info(f"Removed stale bundle {entry.name}")
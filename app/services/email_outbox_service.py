@@ -0,0 +1,147 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Tuple
+
+from flask_mail import Message
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.extensions import mail
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutboxService:
+    """
+    Transactional email outbox. Emails are written as rows in the same
+    transaction as the change that triggers them and delivered later by
+    ``drain``, which reuses one SMTP connection for a whole batch.
+    """
+
+    @staticmethod
+    def enqueue(recipient: str, subject: str, html: str) -> EmailOutbox:
+        """
+        Add an email to the outbox. The row is added to the current session and
+        is committed together with the caller's transaction.
+        """
+        email = EmailOutbox(recipient=recipient, subject=subject, html=html)
+        db.session.add(email)
+        return email
+
+    @staticmethod
+    def drain(batch_size: int = 50, max_attempts: int = 5, backoff_seconds: int = 30) -> Tuple[int, int]:
+        """
+        Deliver one batch of due emails over a single SMTP connection.
+        Failed deliveries are retried with exponential backoff until
+        ``max_attempts`` is reached. Returns the number of sent and failed emails.
+        """
+        now = datetime.utcnow()
+        emails = (
+            EmailOutbox.query
+            .filter(EmailOutbox.status == OutboxStatus.PENDING, EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not emails:
+            db.session.commit()
+            return 0, 0
+
+        sent = failed = 0
+        try:
+            with mail.connect() as connection:
+                for email in emails:
+                    try:
+                        message = Message(email.subject, recipients=[email.recipient])
+                        message.html = email.html
+                        connection.send(message)
+                        email.status = OutboxStatus.SENT
+                        email.sent_at = datetime.utcnow()
+                        email.last_error = None
+                        sent += 1
+                    except Exception as e:
+                        EmailOutboxService._schedule_retry(email, e, max_attempts, backoff_seconds)
+                        failed += 1
+        except Exception as e:
+            # Connecting to the SMTP server failed: retry the whole batch later
+            logger.error(f"Failed to connect to the mail server: {str(e)}")
+            for email in emails:
+                if email.status == OutboxStatus.PENDING and email.sent_at is None:
+                    EmailOutboxService._schedule_retry(email, e, max_attempts, backoff_seconds)
+                    failed += 1
+
+        try:
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error(f"Failed to record outbox delivery results: {str(e)}")
+        logger.info(f"Email outbox drained: {sent} sent, {failed} failed")
+        return sent, failed
+
+    @staticmethod
+    def _schedule_retry(email: EmailOutbox, error: Exception, max_attempts: int, backoff_seconds: int) -> None:
+        email.attempts += 1
+        email.last_error = str(error)
+        if email.attempts >= max_attempts:
+            email.status = OutboxStatus.FAILED
+            logger.error(f"Giving up on email {email.id} to {email.recipient}: {str(error)}")
+        else:
+            email.next_attempt_at = datetime.utcnow() + timedelta(seconds=backoff_seconds * 2 ** (email.attempts - 1))
+            logger.warning(f"Email {email.id} to {email.recipient} failed, retrying later: {str(error)}")
+
+
+class OutboxWorker:
+    """Background thread draining the email outbox."""
+
+    def __init__(self):
+        self.app = None
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def init_app(self, app) -> None:
+        """
+        Start the worker thread with the first request if EMAIL_OUTBOX_WORKER
+        is enabled. CLI commands and the reloader's watcher process never serve
+        requests, so they don't run a worker racing the serving process.
+        """
+        self.app = app
+        if app.config.get('EMAIL_OUTBOX_WORKER', False):
+            app.before_request(self._start)
+
+    def _start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='email-outbox', daemon=True)
+                self._thread.start()
+
+    def notify(self) -> None:
+        """Wake the worker up after new emails were committed."""
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(timeout=self.app.config.get('EMAIL_OUTBOX_POLL_INTERVAL', 10))
+            self._wakeup.clear()
+            with self.app.app_context():
+                try:
+                    while True:
+                        sent, failed = EmailOutboxService.drain(
+                            batch_size=self.app.config.get('EMAIL_OUTBOX_BATCH_SIZE', 50),
+                            max_attempts=self.app.config.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 5),
+                            backoff_seconds=self.app.config.get('EMAIL_OUTBOX_BACKOFF_SECONDS', 30)
+                        )
+                        if sent == 0 or failed:
+                            break
+                except Exception as e:
+                    logger.error(f"Email outbox worker error: {str(e)}")
+                finally:
+                    db.session.remove()
+
+
+outbox_worker = OutboxWorker()
@@ -0,0 +1,104 @@
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Union
+from werkzeug.exceptions import BadRequest
+
+from app.services.progress_service import progress_buffer
+from app.services.review_service import answer_quality
+from app.utils.answer_key_cache import answer_key_cache
+
+# A submitted answer: the selected choice ids or the typed text
+Submission = Union[FrozenSet[int], str]
+
+
+class GradingService:
+    """Grade submitted answers against the cached answer key of a section."""
+
+    def grade_section(self, section_id: int, answers: Any, user_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Grade a set of answers to the questions of a section and, when a user
+        is given, record the attempts in their progress.
+        Returns None if the section does not exist. Unanswered questions count
+        as incorrect in the score.
+        """
+        key = answer_key_cache.get(section_id)
+        if key is None:
+            return None
+
+        submissions = self.parse_answers(answers)
+        results = []
+        attempts = []
+        correct_count = 0
+        for question_id, submitted in submissions:
+            typos = None
+            if question_id in key.choices:
+                correct_choice_ids = key.choices[question_id]
+                correct = submitted == correct_choice_ids
+                result = {'question_id': question_id, 'correct': correct,
+                          'correct_choice_ids': sorted(correct_choice_ids)}
+            elif question_id in key.answers:
+                typos = key.matchers[question_id].match(submitted) if isinstance(submitted, str) else None
+                correct = typos is not None
+                result = {'question_id': question_id, 'correct': correct,
+                          'correct_answer': key.answers[question_id]}
+                if correct:
+                    result['typos'] = typos
+            else:
+                raise BadRequest(f"Question {question_id} is not in section {section_id}")
+            correct_count += correct
+            results.append(result)
+            attempts.append({
+                'question_id': question_id,
+                'choice_id': next(iter(submitted)) if isinstance(submitted, frozenset) and len(submitted) == 1 else None,
+                'answer': submitted[:255] if isinstance(submitted, str) else None,
+                'is_correct': correct,
+                'quality': answer_quality(correct, typos)
+            })
+
+        total = len(key)
+        score = round(correct_count / total, 4) if total else 0.0
+        if user_id is not None and attempts:
+            progress_buffer.record(user_id, section_id, attempts, score)
+        return {
+            'section_id': section_id,
+            'total': total,
+            'answered': len(results),
+            'correct': correct_count,
+            'score': score,
+            'results': results
+        }
+
+    @staticmethod
+    def parse_answers(answers: Any) -> List[Tuple[int, Submission]]:
+        """
+        Parse submitted answers: a list of objects with a ``question_id`` and
+        either ``choice_ids`` (or a single ``choice_id``) or an ``answer`` string.
+        """
+        if not isinstance(answers, list):
+            raise BadRequest("Answers must be a list")
+
+        submissions = []
+        seen = set()
+        for item in answers:
+            if not isinstance(item, dict):
+                raise BadRequest("Each answer must be an object")
+            try:
+                question_id = int(item['question_id'])
+            except (KeyError, TypeError, ValueError):
+                raise BadRequest("Each answer needs a valid question_id")
+            if question_id in seen:
+                raise BadRequest(f"Duplicate answer for question {question_id}")
+            seen.add(question_id)
+
+            if 'choice_ids' in item or 'choice_id' in item:
+                choice_ids = item['choice_ids'] if 'choice_ids' in item else [item['choice_id']]
+                if not isinstance(choice_ids, list):
+                    raise BadRequest(f"choice_ids of question {question_id} must be a list")
+                try:
+                    submitted: Submission = frozenset(int(choice_id) for choice_id in choice_ids)
+                except (TypeError, ValueError):
+                    raise BadRequest(f"Invalid choice id for question {question_id}")
+            elif 'answer' in item:
+                submitted = '' if item['answer'] is None else str(item['answer'])
+            else:
+                raise BadRequest(f"Answer to question {question_id} needs choice_ids or answer")
+            submissions.append((question_id, submitted))
+        return submissions
@@ -1,8 +1,20 @@
 from app import db
 from app.models.level import Level
+from app.models.section import Section
+from app.models.question import Question, QuestionChoice
+from app.models.read_models import LevelView, SectionView, QuestionView, ChoiceView, attach_choices
+from app.services.media_service import MediaService
+from sqlalchemy import delete
 from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.exceptions import BadRequest, HTTPException
 import os
-from app.utils.file_upload import save_file, delete_file
+from app.utils.file_upload import save_file, delete_file, release_media_many
+from app.utils.pagination import paginate
+from app.utils.content_cache import invalidate_level
+
+
+# Depths supported by the level tree, from shallowest to deepest
+TREE_DEPTHS = ('section', 'question', 'choice')
 
 
 class LevelService:
@@ -10,9 +22,61 @@ class LevelService:
         levels = Level.query.all()
         return [level.to_dict() for level in levels]
 
-    def get_by_id(self, level_id):
-        level = Level.query.get(level_id)
-        return level.to_dict() if level else None
+    def get_page(self, after_id=None, limit=50, fields=None):
+        fields = LevelView.parse_fields(fields)
+        rows, next_cursor = paginate(LevelView.select(fields), Level.id, after_id, limit)
+        return [LevelView(row, fields).to_dict() for row in rows], next_cursor
+
+    def get_by_id(self, level_id, fields=None):
+        fields = LevelView.parse_fields(fields)
+        levels = LevelView.fetch(LevelView.select(fields).where(Level.id == level_id), fields)
+        return levels[0].to_dict() if levels else None
+
+    def get_tree(self, level_id, depth='choice'):
+        """
+        Get a level with its sections, questions and choices nested,
+        down to the given depth. Runs one query per depth.
+        """
+        if depth not in TREE_DEPTHS:
+            raise BadRequest(f"Invalid depth. Allowed values: {', '.join(TREE_DEPTHS)}")
+        max_depth = TREE_DEPTHS.index(depth)
+
+        levels = LevelView.fetch(LevelView.select().where(Level.id == level_id))
+        if not levels:
+            return None
+
+        sections = SectionView.fetch(
+            SectionView.select().where(Section.level_id == level_id).order_by(Section.id)
+        )
+        questions_by_section = {section.id: [] for section in sections}
+        if max_depth >= 1:
+            question_fields = None if max_depth >= 2 else tuple(f for f in QuestionView.FIELDS if f != 'choices')
+            questions = QuestionView.fetch(
+                QuestionView.select(question_fields)
+                .join(Section, Question.section_id == Section.id)
+                .where(Section.level_id == level_id)
+                .order_by(Question.id),
+                question_fields
+            )
+            if max_depth >= 2:
+                attach_choices(questions, ChoiceView.fetch(
+                    ChoiceView.select()
+                    .join(Question, QuestionChoice.question_id == Question.id)
+                    .join(Section, Question.section_id == Section.id)
+                    .where(Section.level_id == level_id)
+                    .order_by(QuestionChoice.id)
+                ))
+            for question in questions:
+                questions_by_section[question.section_id].append(question)
+
+        tree = levels[0].to_dict()
+        tree['sections'] = []
+        for section in sections:
+            section_data = section.to_dict()
+            if max_depth >= 1:
+                section_data['questions'] = [question.to_dict() for question in questions_by_section[section.id]]
+            tree['sections'].append(section_data)
+        return tree
 
     def create_level(self, data, file=None):
         try:
@@ -21,6 +85,8 @@ class LevelService:
             if file:
                 try:
                     image_url = save_file(file, 'levels')
+                except HTTPException:
+                    raise
                 except Exception as e:
                     raise Exception(f"Failed to save file: {str(e)}")
 
@@ -31,6 +97,7 @@ class LevelService:
             )
             db.session.add(level)
             db.session.commit()
+            invalidate_level(level.id)
             return level.to_dict()
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -52,6 +119,8 @@ class LevelService:
                     # Save new image
                     image_url = save_file(file, 'levels')
                     data['image_url'] = image_url
+                except HTTPException:
+                    raise
                 except Exception as e:
                     raise Exception(f"Failed to save new file: {str(e)}")
             
@@ -60,6 +129,7 @@ class LevelService:
                 setattr(level, key, value)
             
             db.session.commit()
+            invalidate_level(level_id)
             return level.to_dict()
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -71,16 +141,21 @@ class LevelService:
             if not level:
                 return False
             
-            # Delete associated image if exists
-            if level.image_url:
-                try:
-                    delete_file(level.image_url)
-                except Exception as e:
-                    raise Exception(f"Failed to delete image for level {level_id}: {str(e)}")
-            
+            # Collect the cascaded children before they are gone
+            section_ids = [section_id for (section_id,) in
+                           Section.query.with_entities(Section.id).filter_by(level_id=level_id)]
+            question_ids = [question_id for (question_id,) in
+                            Question.query.with_entities(Question.id).filter(Question.section_id.in_(section_ids))]
+
             try:
-                db.session.delete(level)
+                # Release the media of the level and everything below it; files
+                # are removed in the background once the delete is committed
+                release_media_many(MediaService().get_content_media(level_id=level_id))
+
+                # Sections, questions and choices go with ON DELETE CASCADE
+                db.session.execute(delete(Level).where(Level.id == level_id))
                 db.session.commit()
+                invalidate_level(level_id, section_ids, question_ids, deleted=True)
                 return True
             except SQLAlchemyError as e:
                 db.session.rollback()
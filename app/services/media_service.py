@@ -0,0 +1,213 @@
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from flask import current_app
+from sqlalchemy import case, delete, select, union_all, update
+
+from app import db
+from app.models.level import Level
+from app.models.section import Section
+from app.models.question import Question, QuestionChoice, QuestionType, ChoiceType
+from app.models.media_object import MediaObject
+from app.utils.file_upload import get_upload_folder, get_media_path, shard_dirs
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Columns holding the ``uploads/...`` paths of stored files
+MEDIA_COLUMNS = (
+    Level.__table__.c.image_url,
+    Section.__table__.c.image,
+    Question.__table__.c.question_content,
+    QuestionChoice.__table__.c.content,
+    MediaObject.__table__.c.path,
+)
+
+# Columns whose values are references held by content rows
+REFERENCE_COLUMNS = MEDIA_COLUMNS[:4]
+
+
+class MediaService:
+    """Maintenance of the files stored under UPLOAD_FOLDER."""
+
+    def get_content_media(self, level_id: Optional[int] = None, section_id: Optional[int] = None) -> List[str]:
+        """
+        Get the stored file paths referenced by a level or a section and all of
+        its questions and choices, in a single query. A path is listed once per
+        reference.
+        """
+        if level_id is not None:
+            in_scope = Section.level_id == level_id
+            selects = [
+                select(Level.image_url).where(Level.id == level_id),
+                select(Section.image).where(in_scope),
+            ]
+        else:
+            in_scope = Section.id == section_id
+            selects = [select(Section.image).where(in_scope)]
+
+        selects += [
+            select(Question.question_content)
+            .join(Section, Question.section_id == Section.id)
+            .where(in_scope, Question.question_type != QuestionType.TEXT),
+            select(QuestionChoice.content)
+            .join(Question, QuestionChoice.question_id == Question.id)
+            .join(Section, Question.section_id == Section.id)
+            .where(in_scope, QuestionChoice.choice_type != ChoiceType.TEXT),
+        ]
+        stmt = union_all(*selects)
+        return [path for path in db.session.execute(stmt).scalars() if path]
+
+    def iter_shard_uploads(self, batch_size: int = 500) -> Iterator[Tuple[str, int]]:
+        """
+        Move the files stored flat in the upload folders into their shard
+        directories, one batch at a time. Each file is hard-linked at its new
+        path, the stored paths of the batch are rewritten with one UPDATE per
+        column and committed, and only then is the old name removed.
+        The app must not be running: its caches of responses, answer keys and
+        quiz pools would keep serving the old paths after they are removed.
+        Yields the folder and number of files moved for every batch.
+        """
+        upload_root = current_app.config['UPLOAD_FOLDER']
+        if not os.path.isdir(upload_root):
+            return
+        folders = sorted(entry.name for entry in os.scandir(upload_root) if entry.is_dir())
+
+        for folder in folders:
+            skipped: Set[str] = set()
+            while True:
+                batch = self._flat_files(os.path.join(upload_root, folder), batch_size, skipped)
+                if not batch:
+                    break
+                moved = self._shard_batch(folder, batch, skipped)
+                yield folder, moved
+
+    def _flat_files(self, folder_path: str, limit: int, skipped: Set[str]) -> List[str]:
+        names = []
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if (entry.is_file(follow_symlinks=False) and not entry.name.endswith('.part')
+                        and entry.name not in skipped):
+                    if not shard_dirs(entry.name):
+                        skipped.add(entry.name)
+                        continue
+                    names.append(entry.name)
+                    if len(names) >= limit:
+                        break
+        return names
+
+    def _shard_batch(self, folder: str, names: List[str], skipped: Set[str]) -> int:
+        folder_path = get_upload_folder(folder)
+        renames: Dict[str, str] = {}
+        for name in names:
+            old_path = os.path.join(folder_path, name)
+            new_path = os.path.join(get_upload_folder(folder, name), name)
+            try:
+                if not os.path.exists(new_path):
+                    os.link(old_path, new_path)
+            except OSError as e:
+                logger.error(f"Failed to shard {old_path}: {str(e)}")
+                skipped.add(name)
+                continue
+            renames[os.path.join('uploads', folder, name)] = os.path.join('uploads', folder, *shard_dirs(name), name)
+
+        if renames:
+            try:
+                for column in MEDIA_COLUMNS:
+                    db.session.execute(
+                        update(column.table)
+                        .where(column.in_(list(renames)))
+                        .values({column.name: case(renames, value=column)})
+                    )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+        for old_relative_path in renames:
+            os.remove(os.path.join(folder_path, os.path.basename(old_relative_path)))
+        logger.info(f"Sharded {len(renames)} files in {folder}")
+        return len(renames)
+
+    def collect_garbage(self, grace_seconds: int = 24 * 3600, batch_size: int = 1000,
+                        dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Delete stored files that no row references and that are older than the
+        grace period, which protects uploads whose transaction is still open.
+        The upload tree is walked with os.scandir and checked against the
+        database one batch at a time, so memory stays flat.
+        """
+        upload_root = current_app.config['UPLOAD_FOLDER']
+        cutoff = time.time() - grace_seconds
+        report = {'scanned': 0, 'deleted': 0, 'freed_bytes': 0}
+
+        batch: List[Tuple[str, os.DirEntry]] = []
+        for entry in self._walk(upload_root):
+            batch.append((self._relative_path(upload_root, entry.path), entry))
+            if len(batch) >= batch_size:
+                self._collect_batch(batch, cutoff, dry_run, report)
+                batch = []
+        if batch:
+            self._collect_batch(batch, cutoff, dry_run, report)
+        return report
+
+    def iter_dangling_references(self, batch_size: int = 1000) -> Iterator[Tuple[str, int, str]]:
+        """
+        Stream the stored paths of every media column and yield the table,
+        row id and path of each reference whose file is missing.
+        """
+        for column in REFERENCE_COLUMNS:
+            table = column.table
+            stmt = (
+                select(table.c.id, column)
+                .where(column.like('uploads/%'))
+                .order_by(table.c.id)
+                .execution_options(yield_per=batch_size)
+            )
+            for row_id, path in db.session.execute(stmt):
+                if not os.path.exists(get_media_path(path)):
+                    yield table.name, row_id, path
+
+    def _walk(self, path: str) -> Iterator[os.DirEntry]:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._walk(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+    def _relative_path(self, upload_root: str, full_path: str) -> str:
+        return os.path.join('uploads', os.path.relpath(full_path, upload_root))
+
+    def _collect_batch(self, batch: List[Tuple[str, os.DirEntry]], cutoff: float, dry_run: bool,
+                       report: Dict[str, Any]) -> None:
+        report['scanned'] += len(batch)
+        paths = [path for path, _ in batch]
+        referenced: Set[str] = set()
+        for column in REFERENCE_COLUMNS:
+            referenced.update(db.session.execute(select(column).where(column.in_(paths))).scalars())
+
+        unreferenced = []
+        for path, entry in batch:
+            if path in referenced:
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime >= cutoff:
+                continue
+            if not dry_run:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+                logger.info(f"Removed unreferenced file {path}")
+            unreferenced.append(path)
+            report['deleted'] += 1
+            report['freed_bytes'] += stat.st_size
+
+        if unreferenced and not dry_run:
+            db.session.execute(delete(MediaObject).where(MediaObject.path.in_(unreferenced)))
+        db.session.commit()
@@ -0,0 +1,369 @@
+import atexit
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.level import Level
+from app.models.section import Section
+from app.models.question import Question, QuestionChoice
+from app.models.user import User
+from app.models.progress import QuestionAttempt, SectionProgress
+from app.services.review_service import Review, ReviewService
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Number of attempts inserted per statement
+ATTEMPT_INSERT_BATCH_SIZE = 500
+
+# Pending attempts, as a multiple of the flush size, above which requests flush inline
+BACKPRESSURE_FACTOR = 10
+
+
+class ProgressDelta:
+    """
+    Changes to the progress of a user in a section that are not written yet.
+    ``answers`` maps each answered question to whether its latest answer was
+    correct; it becomes counts of distinct questions once compared with the
+    questions the user had already answered.
+    """
+
+    __slots__ = ('submissions', 'answers', 'best_score', 'last_activity_at')
+
+    def __init__(self, submissions: int = 0, answers: Optional[Dict[int, bool]] = None, best_score: float = 0.0,
+                 last_activity_at: Optional[datetime] = None):
+        self.submissions = submissions
+        self.answers = dict(answers) if answers else {}
+        self.best_score = best_score
+        self.last_activity_at = last_activity_at
+
+    def merge(self, other: "ProgressDelta") -> None:
+        self.submissions += other.submissions
+        self.answers.update(other.answers)
+        self.best_score = max(self.best_score, other.best_score)
+        if self.last_activity_at is None or (other.last_activity_at and other.last_activity_at > self.last_activity_at):
+            self.last_activity_at = other.last_activity_at
+
+    def counts(self, answered: Dict[int, bool]) -> Tuple[int, int]:
+        """
+        Get the number of newly attempted questions and the change in the
+        number of questions whose latest answer is correct, given whether the
+        latest answer was correct for the questions answered before.
+        """
+        attempted = correct = 0
+        for question_id, is_correct in self.answers.items():
+            was_correct = answered.get(question_id)
+            if was_correct is None:
+                attempted += 1
+            correct += int(is_correct) - int(bool(was_correct))
+        return attempted, correct
+
+
+class ProgressBuffer:
+    """
+    Write-behind buffer of graded attempts. Attempts are kept in memory and
+    their per-section aggregates merged as they arrive; a background thread
+    periodically inserts the attempts in batches, upserts the aggregates and
+    reschedules the answered questions for review, so recording a submission
+    costs no queries. Pending changes are only
+    visible to this process, through ``pending``.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.write_behind = False
+        self.flush_interval = 5
+        self.flush_size = 500
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._attempts: List[Dict[str, Any]] = []
+        self._reviews: List[Review] = []
+        self._deltas: Dict[Tuple[int, int], ProgressDelta] = {}
+        # Changes taken by a running flush and not committed yet
+        self._in_flight: Dict[Tuple[int, int], ProgressDelta] = {}
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def init_app(self, app) -> None:
+        """
+        Configure the buffer. If PROGRESS_WRITE_BEHIND is enabled, the flush
+        thread starts with the first request, so CLI commands and the
+        reloader's watcher process don't run one.
+        """
+        self.app = app
+        self.write_behind = app.config.get('PROGRESS_WRITE_BEHIND', False)
+        self.flush_interval = app.config.get('PROGRESS_FLUSH_INTERVAL', self.flush_interval)
+        self.flush_size = app.config.get('PROGRESS_FLUSH_SIZE', self.flush_size)
+        if self.write_behind:
+            app.before_request(self._start)
+
+    def _start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='progress-flush', daemon=True)
+                self._thread.start()
+                atexit.register(self._flush_at_exit)
+
+    def record(self, user_id: int, section_id: int, attempts: Iterable[Dict[str, Any]], score: float) -> None:
+        """
+        Buffer the graded attempts of one submission. Each attempt holds the
+        question_id, choice_id, answer, is_correct and review quality of an
+        answered question.
+        """
+        now = datetime.utcnow()
+        rows = []
+        reviews = []
+        for attempt in attempts:
+            rows.append({'user_id': user_id, 'section_id': section_id, 'question_id': attempt['question_id'],
+                         'choice_id': attempt['choice_id'], 'answer': attempt['answer'],
+                         'is_correct': attempt['is_correct'], 'created_at': now})
+            reviews.append((user_id, attempt['question_id'], attempt['quality'], now))
+        delta = ProgressDelta(1, {row['question_id']: row['is_correct'] for row in rows}, score, now)
+        with self._lock:
+            self._attempts.extend(rows)
+            self._reviews.extend(reviews)
+            self._merge(self._deltas, (user_id, section_id), delta)
+            pending = len(self._attempts)
+
+        if not self.write_behind or pending >= self.flush_size * BACKPRESSURE_FACTOR:
+            self.flush()
+        elif pending >= self.flush_size:
+            self._wakeup.set()
+
+    def pending(self, user_id: int, section_ids: Iterable[int]) -> Dict[int, ProgressDelta]:
+        """Get the unwritten progress changes of a user in the given sections."""
+        result: Dict[int, ProgressDelta] = {}
+        with self._lock:
+            for deltas in (self._in_flight, self._deltas):
+                for section_id in section_ids:
+                    delta = deltas.get((user_id, section_id))
+                    if delta is not None:
+                        self._merge(result, section_id, delta)
+        return result
+
+    def flush(self) -> int:
+        """
+        Write the buffered attempts and aggregates in one transaction.
+        Returns the number of attempts written. On failure the changes are
+        put back into the buffer.
+        """
+        with self._flush_lock:
+            with self._lock:
+                attempts, self._attempts = self._attempts, []
+                reviews, self._reviews = self._reviews, []
+                deltas, self._deltas = self._deltas, {}
+                self._in_flight = deltas
+            if not attempts and not deltas:
+                return 0
+
+            try:
+                try:
+                    self._write(attempts, reviews, deltas)
+                except IntegrityError:
+                    # Content or users deleted while their attempts were buffered
+                    db.session.rollback()
+                    attempts, reviews, deltas = self._drop_orphans(attempts, reviews, deltas)
+                    self._write(attempts, reviews, deltas)
+            except Exception:
+                db.session.rollback()
+                with self._lock:
+                    self._attempts[:0] = attempts
+                    self._reviews[:0] = reviews
+                    for key, delta in deltas.items():
+                        self._merge(self._deltas, key, delta)
+                    self._in_flight = {}
+                raise
+
+            with self._lock:
+                self._in_flight = {}
+            logger.info(f"Flushed {len(attempts)} attempts and {len(deltas)} progress rows")
+            return len(attempts)
+
+    @staticmethod
+    def _merge(deltas: Dict[Any, ProgressDelta], key: Any, delta: ProgressDelta) -> None:
+        if key in deltas:
+            deltas[key].merge(delta)
+        else:
+            deltas[key] = ProgressDelta(delta.submissions, delta.answers, delta.best_score, delta.last_activity_at)
+
+    def _write(self, attempts: List[Dict[str, Any]], reviews: List[Review],
+               deltas: Dict[Tuple[int, int], ProgressDelta]) -> None:
+        for start in range(0, len(attempts), ATTEMPT_INSERT_BATCH_SIZE):
+            db.session.execute(insert(QuestionAttempt.__table__), attempts[start:start + ATTEMPT_INSERT_BATCH_SIZE])
+        previous = ReviewService().apply_reviews(reviews)
+        if deltas:
+            rows = []
+            for (user_id, section_id), delta in deltas.items():
+                attempted, correct = delta.counts({question_id: previous[(user_id, question_id)]
+                                                   for question_id in delta.answers
+                                                   if (user_id, question_id) in previous})
+                rows.append({'user_id': user_id, 'section_id': section_id, 'submissions': delta.submissions,
+                             'attempted': attempted, 'correct': correct, 'best_score': delta.best_score,
+                             'last_activity_at': delta.last_activity_at})
+            self._upsert_progress(rows)
+        db.session.commit()
+
+    def _upsert_progress(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Add the deltas to the stored aggregates with the dialect's upsert.
+        ``attempted`` counts distinct questions and ``correct`` the questions
+        whose latest answer is correct, so its delta may be negative.
+        """
+        table = SectionProgress.__table__
+        dialect = db.session.get_bind().dialect.name
+
+        def merged(new):
+            return {
+                'submissions': table.c.submissions + new.submissions,
+                'attempted': table.c.attempted + new.attempted,
+                'correct': table.c.correct + new.correct,
+                'best_score': case((new.best_score > table.c.best_score, new.best_score), else_=table.c.best_score),
+                'last_activity_at': case((new.last_activity_at > table.c.last_activity_at, new.last_activity_at),
+                                         else_=table.c.last_activity_at),
+            }
+
+        if dialect in ('sqlite', 'postgresql'):
+            stmt = (sqlite if dialect == 'sqlite' else postgresql).insert(table)
+            stmt = stmt.on_conflict_do_update(index_elements=[table.c.user_id, table.c.section_id],
+                                              set_=merged(stmt.excluded))
+            db.session.execute(stmt, rows)
+        elif dialect in ('mysql', 'mariadb'):
+            stmt = mysql.insert(table)
+            stmt = stmt.on_duplicate_key_update(merged(stmt.inserted))
+            db.session.execute(stmt, rows)
+        else:
+            for row in rows:
+                result = db.session.execute(
+                    update(table)
+                    .where(table.c.user_id == row['user_id'], table.c.section_id == row['section_id'])
+                    .values(
+                        submissions=table.c.submissions + row['submissions'],
+                        attempted=table.c.attempted + row['attempted'],
+                        correct=table.c.correct + row['correct'],
+                        best_score=case((table.c.best_score < row['best_score'], row['best_score']),
+                                        else_=table.c.best_score),
+                        last_activity_at=row['last_activity_at']
+                    )
+                )
+                if result.rowcount == 0:
+                    db.session.execute(insert(table).values(**row))
+
+    def _drop_orphans(self, attempts: List[Dict[str, Any]], reviews: List[Review],
+                      deltas: Dict[Tuple[int, int], ProgressDelta]):
+        def existing(column, ids) -> set:
+            return set(db.session.execute(select(column).where(column.in_(set(ids)))).scalars()) if ids else set()
+
+        user_ids = existing(User.id, [user_id for user_id, _ in deltas])
+        section_ids = existing(Section.id, [section_id for _, section_id in deltas])
+        question_ids = existing(Question.id, [attempt['question_id'] for attempt in attempts])
+        choice_ids = existing(QuestionChoice.id, [attempt['choice_id'] for attempt in attempts if attempt['choice_id']])
+
+        kept = []
+        for attempt in attempts:
+            if (attempt['user_id'] in user_ids and attempt['section_id'] in section_ids
+                    and attempt['question_id'] in question_ids):
+                if attempt['choice_id'] not in choice_ids:
+                    attempt['choice_id'] = None
+                kept.append(attempt)
+        dropped = len(attempts) - len(kept)
+        if dropped:
+            logger.warning(f"Dropped {dropped} buffered attempts on deleted content")
+        reviews = [review for review in reviews if review[0] in user_ids and review[1] in question_ids]
+        deltas = {key: delta for key, delta in deltas.items() if key[0] in user_ids and key[1] in section_ids}
+        for delta in deltas.values():
+            delta.answers = {question_id: is_correct for question_id, is_correct in delta.answers.items()
+                             if question_id in question_ids}
+        return kept, reviews, deltas
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            with self.app.app_context():
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Progress flush failed: {str(e)}")
+                finally:
+                    db.session.remove()
+
+    def _flush_at_exit(self) -> None:
+        with self.app.app_context():
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush progress at exit: {str(e)}")
+
+
+progress_buffer = ProgressBuffer()
+
+
+class ProgressService:
+    """Read per-user progress from the precomputed section aggregates."""
+
+    def get_level_progress(self, user_id: int, level_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the progress of a user in every section of a level, with one query
+        over the level's sections and their progress rows, merged with the
+        changes still in the write-behind buffer. Buffered answers are compared
+        with the questions already answered, with one more query, so
+        ``attempted`` and ``correct`` keep counting distinct questions.
+        Returns None if the level does not exist.
+        """
+        stmt = (
+            select(Level.id, Section.id, Section.name, SectionProgress.submissions, SectionProgress.attempted,
+                   SectionProgress.correct, SectionProgress.best_score, SectionProgress.last_activity_at)
+            .select_from(Level)
+            .outerjoin(Section, Section.level_id == Level.id)
+            .outerjoin(SectionProgress, and_(SectionProgress.section_id == Section.id,
+                                             SectionProgress.user_id == user_id))
+            .where(Level.id == level_id)
+            .order_by(Section.id)
+        )
+        rows = db.session.execute(stmt).all()
+        if not rows:
+            return None
+
+        rows = [row for row in rows if row[1] is not None]
+        pending = progress_buffer.pending(user_id, [row[1] for row in rows])
+        answered = ReviewService.get_answered(
+            user_id, [question_id for delta in pending.values() for question_id in delta.answers]
+        ) if pending else {}
+        sections = []
+        for _, section_id, name, submissions, attempted, correct, best_score, last_activity_at in rows:
+            progress = ProgressDelta(submissions or 0, None, best_score or 0.0, last_activity_at)
+            attempted, correct = attempted or 0, correct or 0
+            if section_id in pending:
+                progress.merge(pending[section_id])
+                new_attempted, new_correct = pending[section_id].counts(answered)
+                attempted += new_attempted
+                correct += new_correct
+            sections.append({
+                'section_id': section_id,
+                'name': name,
+                'submissions': progress.submissions,
+                'attempted': attempted,
+                'correct': correct,
+                'best_score': progress.best_score,
+                'last_activity_at': progress.last_activity_at.isoformat() if progress.last_activity_at else None
+            })
+
+        started = [section for section in sections if section['submissions']]
+        activity = [section['last_activity_at'] for section in started]
+        return {
+            'level_id': level_id,
+            'sections_total': len(sections),
+            'sections_started': len(started),
+            'attempted': sum(section['attempted'] for section in sections),
+            'correct': sum(section['correct'] for section in sections),
+            'score': round(sum(section['best_score'] for section in sections) / len(sections), 4) if sections else 0.0,
+            'last_activity_at': max(activity) if activity else None,
+            'sections': sections
+        }
@@ -1,15 +1,31 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Iterator, Iterable
 from werkzeug.datastructures import FileStorage
-from werkzeug.exceptions import BadRequest
+from werkzeug.exceptions import BadRequest, HTTPException
 import json
+import os
+import uuid
 from flask import request
+from sqlalchemy import insert, select, update
 
 from app.models.question import Question, QuestionChoice, QuestionType, AnswerType, ChoiceType
+from app.models.section import Section
+from app.models.read_models import QuestionView, attach_choices, stream_questions
 from app.services.base_service import BaseService
-from app.utils.file_upload import save_file, delete_file
+from app.utils.file_upload import save_file, delete_file, acquire_media, get_media_path
+from app.utils.pagination import paginate
+from app.utils.content_cache import invalidate_question, invalidate_questions
+from app.utils.bulk_import import ImportRow
+from app.utils.answer_matching import split_answers
+from app.utils.helpers import parse_bool
 from app import db
 from sqlalchemy.exc import SQLAlchemyError
 
+# Number of imported rows inserted per flush
+IMPORT_BATCH_SIZE = 500
+
+# Maximum number of row errors returned by an import
+IMPORT_MAX_ERRORS = 100
+
 
 class QuestionService(BaseService):
     """Service class for handling question-related operations."""
@@ -27,13 +43,60 @@ class QuestionService(BaseService):
     def get_questions_by_section(self, section_id: int) -> List[Question]:
         return self.query().filter_by(section_id=section_id).all()
 
-    def create_question(self, data, question_file=None, files=None):
+    def get_page_with_choices(self, section_id: Optional[int] = None, level_id: Optional[int] = None,
+                              after_id: Optional[int] = None, limit: int = 50,
+                              fields: Optional[str] = None) -> Tuple[List[QuestionView], Optional[str]]:
+        """
+        Get one page of read-only questions with their choices,
+        optionally filtered by section and/or level. Runs two queries per page,
+        or one when the requested fields do not include choices.
+        """
+        fields = QuestionView.parse_fields(fields)
+        stmt = QuestionView.select(fields)
+        if section_id:
+            stmt = stmt.where(Question.section_id == section_id)
+        if level_id:
+            stmt = stmt.join(Section, Question.section_id == Section.id).where(Section.level_id == level_id)
+        rows, next_cursor = paginate(stmt, Question.id, after_id, limit)
+        questions = [QuestionView(row, fields) for row in rows]
+        attach_choices(questions)
+        return questions, next_cursor
+
+    def get_by_id_with_choices(self, question_id: int, fields: Optional[str] = None) -> Optional[QuestionView]:
+        """ Get a read-only question by ID with its choices, restricted to the given comma-separated fields. """
+        fields = QuestionView.parse_fields(fields)
+        questions = QuestionView.fetch(QuestionView.select(fields).where(Question.id == question_id), fields)
+        attach_choices(questions)
+        return questions[0] if questions else None
+
+    def iter_export(self, section_id: Optional[int] = None, level_id: Optional[int] = None) -> Iterator[QuestionView]:
+        """
+        Stream every question with its choices, optionally filtered by section and/or level.
+        """
+        criteria = []
+        if section_id:
+            criteria.append(Question.section_id == section_id)
+        if level_id:
+            criteria.append(Section.level_id == level_id)
+        return stream_questions(*criteria)
+
+    @staticmethod
+    def validate_question_data(data: Dict[str, Any]) -> Tuple[QuestionType, AnswerType, List[Dict[str, Any]]]:
+        """
+        Validate the fields shared by every way of creating a question.
+        Returns the question type, answer type and parsed choices.
+        """
         # Parse choices
         choices = data.get('choices')
         if choices and isinstance(choices, str):
-            choices = json.loads(choices)
+            try:
+                choices = json.loads(choices)
+            except ValueError:
+                raise BadRequest("Invalid choices JSON")
         elif not choices:
             choices = []
+        if not isinstance(choices, list) or not all(isinstance(choice, dict) for choice in choices):
+            raise BadRequest("Choices must be a list of objects")
 
         # Validate enums
         try:
@@ -42,6 +105,19 @@ class QuestionService(BaseService):
         except Exception:
             raise BadRequest("Invalid question_type or answer_type")
 
+        # Validate answers
+        if atype == AnswerType.MULTIPLE_CHOICE and choices:
+            if not any(parse_bool(choice_data.get('is_correct', False)) for choice_data in choices):
+                raise BadRequest("At least one choice must be marked as correct")
+        elif atype == AnswerType.FILL_IN_BLANK:
+            if not split_answers(data.get('correct_answer')):
+                raise BadRequest("Correct answer is required for fill-in-the-blank questions")
+
+        return qtype, atype, choices
+
+    def create_question(self, data, question_file=None, files=None):
+        qtype, atype, choices = self.validate_question_data(data)
+
         # Handle question content file
         if qtype in [QuestionType.IMAGE, QuestionType.AUDIO]:
             if not question_file:
@@ -62,88 +138,294 @@ class QuestionService(BaseService):
             correct_answer=data.get('correct_answer')
         )
 
-        # Handle choices
-        if atype == AnswerType.MULTIPLE_CHOICE and choices:
-            has_correct = False
-            for idx, choice_data in enumerate(choices):
-                if choice_data.get('is_correct', False):
-                    has_correct = True
-            if not has_correct:
-                raise BadRequest("At least one choice must be marked as correct")
-        elif atype == AnswerType.FILL_IN_BLANK:
-            if not data.get('correct_answer'):
-                raise BadRequest("Correct answer is required for fill-in-the-blank questions")
-
         try:
             db.session.add(question)
             db.session.commit()
+            invalidate_question(question.id, [question.section_id])
             return question
         except SQLAlchemyError as e:
             db.session.rollback()
             print("Database error:", e)
             raise BadRequest(f"Database error: {str(e)}")
     
+    def import_questions(self, rows: Iterable[ImportRow], partial: bool = False) -> Dict[str, Any]:
+        """
+        Import questions with their choices in a single transaction. Rows are
+        validated with the same rules as create_question and inserted in
+        batches of executemany INSERTs for questions and for choices.
+        Image/audio content must be the path of an already stored file.
+        Unless ``partial`` is set, any invalid row rolls back the whole
+        import; otherwise valid rows are kept and invalid ones reported.
+        """
+        errors: List[Dict[str, Any]] = []
+        error_count = 0
+        imported = 0
+        section_levels: Dict[int, Optional[int]] = {}
+        batch: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]] = []
+
+        try:
+            for row_number, record, error in rows:
+                if error is None:
+                    try:
+                        batch.append(self._build_import_row(record, section_levels))
+                    except BadRequest as e:
+                        error = e.description
+                if error is not None:
+                    error_count += 1
+                    if len(errors) < IMPORT_MAX_ERRORS:
+                        errors.append({'row': row_number, 'error': error})
+                    continue
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    imported += self._insert_import_batch(batch)
+                    batch = []
+            if batch:
+                imported += self._insert_import_batch(batch)
+
+            if error_count and not partial:
+                db.session.rollback()
+                imported = 0
+            else:
+                db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise BadRequest(f"Database error: {str(e)}")
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if imported:
+            section_ids = [section_id for section_id, level_id in section_levels.items() if level_id]
+            invalidate_questions((), section_ids)
+        return {'imported': imported, 'failed': error_count, 'errors': errors}
+
+    def _build_import_row(self, record: Dict[str, Any],
+                          section_levels: Dict[int, Optional[int]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """ Validate one imported row and build the values of its question and choices. """
+        qtype, atype, choices = self.validate_question_data(record)
+
+        try:
+            section_id = int(record['section_id'])
+        except (KeyError, TypeError, ValueError):
+            raise BadRequest("A valid section_id is required")
+        if section_id not in section_levels:
+            section_levels[section_id] = db.session.execute(
+                select(Section.level_id).where(Section.id == section_id)
+            ).scalar()
+        if not section_levels[section_id]:
+            raise BadRequest(f"Section {section_id} not found")
+
+        question_content = record.get('question_content')
+        if not question_content:
+            raise BadRequest("Question content is required")
+        if qtype in [QuestionType.IMAGE, QuestionType.AUDIO]:
+            self._check_stored_media(question_content)
+
+        choice_values = []
+        for choice_data in choices:
+            try:
+                ctype = ChoiceType(choice_data.get('choice_type') or choice_data.get('type'))
+            except ValueError:
+                raise BadRequest("Invalid choice type")
+            content = choice_data.get('content')
+            if not content:
+                raise BadRequest("Choice content is required")
+            if ctype in [ChoiceType.IMAGE, ChoiceType.AUDIO]:
+                self._check_stored_media(content)
+            choice_values.append({
+                'choice_type': ctype,
+                'content': content,
+                'is_correct': parse_bool(choice_data.get('is_correct', False))
+            })
+
+        question_values = {
+            'section_id': section_id,
+            'question_type': qtype,
+            'question_content': question_content,
+            'answer_type': atype,
+            'correct_answer': record.get('correct_answer')
+        }
+        return question_values, choice_values
+
+    @staticmethod
+    def _check_stored_media(path: str) -> None:
+        if not path.startswith('uploads/') or not os.path.isfile(get_media_path(path)):
+            raise BadRequest(f"Media file not found: {path}")
+
+    def _insert_import_batch(self, batch: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> int:
+        question_rows = [question_values for question_values, _ in batch]
+        if db.session.get_bind().dialect.name == 'postgresql':
+            # One batched INSERT returning the new ids in row order
+            question_ids = db.session.scalars(
+                insert(Question).returning(Question.id, sort_by_parameter_order=True),
+                question_rows
+            ).all()
+        else:
+            # MySQL has no RETURNING, and SQLite can only return ids in row order
+            # one INSERT at a time. Each row is tagged with the batch token and
+            # its position instead, and the ids are read back with one SELECT
+            token = uuid.uuid4().hex
+            tagged = Question.import_token.like(f'{token}:%')
+            db.session.execute(insert(Question), [
+                dict(question_values, import_token=f'{token}:{position}')
+                for position, question_values in enumerate(question_rows)
+            ])
+            ids = dict(db.session.execute(select(Question.import_token, Question.id).where(tagged)).all())
+            question_ids = [ids[f'{token}:{position}'] for position in range(len(question_rows))]
+            db.session.execute(
+                update(Question).where(tagged).values(import_token=None)
+                .execution_options(synchronize_session=False)
+            )
+
+        choice_rows = [
+            dict(choice_values, question_id=question_id)
+            for question_id, (_, choices) in zip(question_ids, batch)
+            for choice_values in choices
+        ]
+        if choice_rows:
+            db.session.execute(insert(QuestionChoice), choice_rows)
+
+        # Stored files referenced by the imported rows gain a reference each
+        for question_values, choices in batch:
+            if question_values['question_type'] != QuestionType.TEXT:
+                acquire_media(question_values['question_content'])
+            for choice_values in choices:
+                if choice_values['choice_type'] != ChoiceType.TEXT:
+                    acquire_media(choice_values['content'])
+        return len(batch)
+
     def update_question(self, question_id: int, data: Dict[str, Any], question_file: Optional[FileStorage] = None) -> Optional[Question]:
         question = self.get_by_id(question_id)
         if not question:
             return None
+        old_section_id = question.section_id
+        old_media = question.question_content if question.question_type != QuestionType.TEXT else None
         
         # Handle question content file upload
         if data.get('question_type') in ['image', 'audio']:
             if question_file:
-                # Delete old file if exists
-                if question.question_content and question.question_type != QuestionType.TEXT:
-                    delete_file(question.question_content)
-                # Save new file
-                file_path = save_file(question_file, 'questions')
-                data['question_content'] = file_path
+                # Release the old file before saving the new one, which may
+                # land on the same path
+                if old_media:
+                    delete_file(old_media)
+                    old_media = None
+                data['question_content'] = save_file(question_file, 'questions')
             elif not data.get('question_content'):
                 raise BadRequest("Question file is required for image/audio type")
         
         # Update question fields
+        try:
+            enum_fields = {
+                'question_type': QuestionType(data['question_type']) if 'question_type' in data else None,
+                'answer_type': AnswerType(data['answer_type']) if 'answer_type' in data else None
+            }
+        except ValueError:
+            raise BadRequest("Invalid question_type or answer_type")
         for key, value in data.items():
             if key not in ['choices', 'correct_answer']:
-                setattr(question, key, value)
+                setattr(question, key, enum_fields.get(key) or value)
+
+        # Release the old file if it was replaced
+        if old_media and question.question_content != old_media:
+            delete_file(old_media)
         
         # Handle choices for multiple choice
         if data.get('answer_type') == AnswerType.MULTIPLE_CHOICE.value or question.answer_type == AnswerType.MULTIPLE_CHOICE:
             if data.get('choices'):
-                choices = json.loads(data['choices'])
-                # Delete existing choices and their files if needed
-                for choice in question.choices:
-                    if choice.choice_type != ChoiceType.TEXT:
-                        delete_file(choice.content)
-                question.choices = []
-                # Add new choices
-                for choice_data in choices:
-                    if choice_data['type'] in ['image', 'audio']:
-                        file_key = choice_data['content']
-                        file = request.files.get(file_key)
-                        if file:
-                            file_path = save_file(file, 'questions')
-                            choice_data['content'] = file_path
-                    choice = QuestionChoice(
-                        choice_type=ChoiceType(choice_data['type']),
-                        content=choice_data['content'],
-                        is_correct=choice_data.get('is_correct', False)
-                    )
-                    question.choices.append(choice)
+                choices = data['choices']
+                if isinstance(choices, str):
+                    choices = json.loads(choices)
+                self._apply_choice_diff(question, choices)
                 # Validate at least one correct choice
-                if not any(c.get('is_correct', False) for c in choices):
+                if not any(choice.is_correct for choice in question.choices):
                     raise BadRequest("At least one choice must be marked as correct")
         else:  # Fill in the blank
-            if not data.get('correct_answer'):
+            if not split_answers(data.get('correct_answer')):
                 raise BadRequest("Correct answer is required for fill-in-the-blank questions")
             question.correct_answer = data['correct_answer']
         
         try:
             db.session.commit()
+            invalidate_question(question_id, [old_section_id, question.section_id])
             return question
         except SQLAlchemyError as e:
             db.session.rollback()
             print("Database error:", e)
             raise BadRequest(f"Database error: {str(e)}")
     
+    def _apply_choice_diff(self, question: Question, choices: List[Dict[str, Any]]) -> None:
+        """
+        Update the choices of a question from the submitted list, matched by
+        choice id: changed columns of existing choices are updated, choices
+        without an id are inserted and missing ones are deleted. Fields left
+        out of an existing choice keep their stored values. Image/audio
+        content names an uploaded file or the path of a stored one; media
+        files of unchanged choices are kept. All changes go out in the next flush,
+        where the unit of work batches them per statement.
+        """
+        existing = {choice.id: choice for choice in question.choices}
+        kept_ids = set()
+
+        for choice_data in choices:
+            choice = None
+            if choice_data.get('id') is not None:
+                try:
+                    choice = existing.get(int(choice_data['id']))
+                except (TypeError, ValueError):
+                    choice = None
+                if choice is None:
+                    raise BadRequest(f"Choice {choice_data['id']} does not belong to this question")
+                kept_ids.add(choice.id)
+
+            # Fields left out keep the stored values of an existing choice
+            type_value = choice_data.get('type') or choice_data.get('choice_type')
+            if type_value is None and choice is not None:
+                ctype = choice.choice_type
+            else:
+                try:
+                    ctype = ChoiceType(type_value)
+                except ValueError:
+                    raise BadRequest("Invalid choice type")
+            if 'is_correct' in choice_data:
+                is_correct = parse_bool(choice_data['is_correct'])
+            else:
+                is_correct = choice.is_correct if choice else False
+
+            old_media = choice.content if choice and choice.choice_type != ChoiceType.TEXT else None
+            content = choice_data.get('content', choice.content if choice else None)
+            if ctype in [ChoiceType.IMAGE, ChoiceType.AUDIO]:
+                file = request.files.get(content) if content else None
+                if file:
+                    # Release the old file before saving the new one, which
+                    # may land on the same path
+                    if old_media:
+                        delete_file(old_media)
+                        old_media = None
+                    content = save_file(file, 'questions')
+                elif content != old_media:
+                    # A file stored earlier, referenced by path as in imports
+                    self._check_stored_media(content or '')
+                    acquire_media(content)
+
+            if choice is None:
+                question.choices.append(QuestionChoice(choice_type=ctype, content=content, is_correct=is_correct))
+                continue
+
+            if choice.choice_type != ctype:
+                choice.choice_type = ctype
+            if choice.content != content:
+                choice.content = content
+            if choice.is_correct != is_correct:
+                choice.is_correct = is_correct
+            # Release the old file if it was replaced
+            if old_media and choice.content != old_media:
+                delete_file(old_media)
+
+        for choice_id, choice in existing.items():
+            if choice_id not in kept_ids:
+                if choice.choice_type != ChoiceType.TEXT and choice.content:
+                    delete_file(choice.content)
+                question.choices.remove(choice)
+
     def delete_question(self, question_id: int) -> bool:
         question = self.get_by_id(question_id)
         if not question:
@@ -158,9 +440,11 @@ class QuestionService(BaseService):
             if choice.choice_type != ChoiceType.TEXT:
                 delete_file(choice.content)
         
+        section_id = question.section_id
         try:
             db.session.delete(question)
             db.session.commit()
+            invalidate_question(question_id, [section_id])
             return True
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -188,7 +472,7 @@ class QuestionService(BaseService):
                 if not file:
                     raise BadRequest(f"File for choice {content} is missing")
                 content = save_file(file, 'questions')
-            is_correct = choice_data.get('is_correct', False)
+            is_correct = parse_bool(choice_data.get('is_correct', False))
             choice = QuestionChoice(
                 question_id=question_id,
                 choice_type=ctype,
@@ -198,6 +482,7 @@ class QuestionService(BaseService):
             db.session.add(choice)
             new_choices.append(choice)
         db.session.commit()
+        invalidate_question(question_id, [question.section_id])
         return new_choices
 
 
@@ -205,8 +490,12 @@ class QuestionService(BaseService):
         choice = QuestionChoice.query.filter_by(id=choice_id, question_id=question_id).first()
         if not choice:
             raise BadRequest("Choice not found")
+        section_id = choice.question.section_id
+        if choice.choice_type != ChoiceType.TEXT and choice.content:
+            delete_file(choice.content)
         db.session.delete(choice)
         db.session.commit()
+        invalidate_question(question_id, [section_id])
 
     def add_single_choice(self, question_id, data, files=None):
         question = self.get_by_id(question_id)
@@ -222,7 +511,7 @@ class QuestionService(BaseService):
             if not file:
                 raise BadRequest("File for choice content is missing")
             content = save_file(file, 'questions')
-        is_correct = data.get('is_correct', 'false').lower() == 'true'
+        is_correct = parse_bool(data.get('is_correct', False))
         choice = QuestionChoice(
             question_id=question_id,
             choice_type=ctype,
@@ -231,33 +520,44 @@ class QuestionService(BaseService):
         )
         db.session.add(choice)
         db.session.commit()
+        invalidate_question(question_id, [question.section_id])
         return choice
 
     def update_single_choice(self, question_id, choice_id, data, files=None):
         choice = QuestionChoice.query.filter_by(id=choice_id, question_id=question_id).first()
         if not choice:
             raise BadRequest("Choice not found")
+        old_media = choice.content if choice.choice_type != ChoiceType.TEXT else None
         try:
             if 'choice_type' in data:
                 ctype = ChoiceType(data['choice_type'])
                 choice.choice_type = ctype
             if 'is_correct' in data:
-                choice.is_correct = str(data['is_correct']).lower() == 'true'
+                choice.is_correct = parse_bool(data['is_correct'])
             if 'content' in data:
                 content = data['content']
                 if choice.choice_type in [ChoiceType.IMAGE, ChoiceType.AUDIO]:
                     file = files.get('content') if files else None
                     if file:
-                        # Delete old file if exists
-                        if choice.content:
-                            delete_file(choice.content)
+                        # Release the old file before saving the new one,
+                        # which may land on the same path
+                        if old_media:
+                            delete_file(old_media)
+                            old_media = None
                         content = save_file(file, 'questions')
                     else:
                         # If no new file, keep the old content
                         content = choice.content
                 choice.content = content
+            # Release the old file if it was replaced
+            if old_media and choice.content != old_media:
+                delete_file(old_media)
             db.session.commit()
+            invalidate_question(question_id, [choice.question.section_id])
             return choice
+        except HTTPException:
+            db.session.rollback()
+            raise
         except Exception as e:
             db.session.rollback()
             print("Error updating choice:", e)
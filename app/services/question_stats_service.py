@@ -0,0 +1,254 @@
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, cast, delete, func, insert, select
+
+from app import db
+from app.models.section import Section
+from app.models.question import Question, QuestionChoice
+from app.models.progress import QuestionAttempt
+from app.models.question_stats import QuestionStats, ChoiceStats
+from app.utils.pagination import paginate
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed to compute the stats
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Attempts fetched per round trip while loading
+LOAD_BATCH_SIZE = 100000
+
+# Rows inserted per statement when storing the stats
+STATS_INSERT_BATCH_SIZE = 1000
+
+# Responses below which the discrimination of a question is not reported
+MIN_DISCRIMINATION_RESPONSES = 5
+
+# Thresholds of the flags reported to admins
+TOO_EASY_P_VALUE = 0.9
+TOO_HARD_P_VALUE = 0.3
+LOW_DISCRIMINATION = 0.2
+
+
+class QuestionStatsService:
+    """
+    Classical item analysis of the questions from the recorded attempts.
+    Only each learner's first attempt at a question is counted.
+    """
+
+    def compute(self, batch_size: int = LOAD_BATCH_SIZE,
+                min_responses: int = MIN_DISCRIMINATION_RESPONSES) -> Dict[str, Any]:
+        """
+        Load every attempt into NumPy arrays and replace the stored stats with
+        per-question p-values and point-biserial discrimination, and
+        per-choice selection rates, all computed with grouped array sums
+        (``bincount``) rather than per-row loops or GROUP BY queries.
+        Returns a report of the counts and elapsed time.
+        """
+        if np is None:
+            raise RuntimeError("Computing question stats requires numpy (pip install numpy)")
+
+        started = time.monotonic()
+        attempts = self._load_attempts(batch_size)
+        users, questions, choices, correct = attempts.T
+        first = self._first_attempts(users, questions)
+        users, questions, choices = users[first], questions[first], choices[first]
+        correct = correct[first].astype(np.float64)
+
+        # Ids are used directly as bincount indices, which avoids sorting them
+        size = int(questions.max()) + 1 if len(questions) else 0
+        responses = np.bincount(questions, minlength=size)
+        question_ids = np.flatnonzero(responses)
+        p_values = np.bincount(questions, weights=correct, minlength=size)[question_ids] / responses[question_ids]
+        discrimination = self._point_biserial(users, questions, correct, size, min_responses)[question_ids]
+        choice_ids, choice_question_ids, selections, selection_rates = self._choice_rates(questions, choices)
+        responses = responses[question_ids]
+
+        now = datetime.utcnow()
+        question_rows = [
+            {'question_id': question_id, 'responses': count, 'p_value': p_value,
+             'discrimination': None if np.isnan(r) else r, 'computed_at': now}
+            for question_id, count, p_value, r in zip(question_ids.tolist(), responses.tolist(),
+                                                      p_values.tolist(), discrimination.tolist())
+        ]
+        choice_rows = [
+            {'choice_id': choice_id, 'question_id': question_id, 'selections': count, 'selection_rate': rate,
+             'computed_at': now}
+            for choice_id, question_id, count, rate in zip(choice_ids.tolist(), choice_question_ids.tolist(),
+                                                           selections.tolist(), selection_rates.tolist())
+        ]
+        self._store(question_rows, choice_rows)
+
+        report = {
+            'attempts': len(attempts),
+            'responses': len(first),
+            'questions': len(question_rows),
+            'choices': len(choice_rows),
+            'seconds': round(time.monotonic() - started, 3)
+        }
+        logger.info(f"Computed question stats: {report}")
+        return report
+
+    def _load_attempts(self, batch_size: int):
+        """Stream the attempts as rows of (user_id, question_id, choice_id or 0, is_correct)."""
+        stmt = (
+            select(QuestionAttempt.user_id, QuestionAttempt.question_id,
+                   func.coalesce(QuestionAttempt.choice_id, 0), cast(QuestionAttempt.is_correct, Integer))
+            .order_by(QuestionAttempt.id)
+            .execution_options(yield_per=batch_size)
+        )
+        chunks = [np.array(partition, dtype=np.int64) for partition in db.session.execute(stmt).partitions()]
+        return np.concatenate(chunks) if chunks else np.empty((0, 4), dtype=np.int64)
+
+    @staticmethod
+    def _first_attempts(users, questions):
+        """
+        Get the positions of each learner's first attempt at each question.
+        The (user, question) pair and the position are packed into one integer
+        when it fits, so a plain sort groups the pairs in attempt order.
+        """
+        count = len(users)
+        if not count:
+            return np.empty(0, dtype=np.int64)
+        pairs = users * (int(questions.max()) + 1) + questions
+        if int(pairs.max()) < np.iinfo(np.int64).max // count:
+            packed = np.sort(pairs * count + np.arange(count))
+            sorted_pairs, positions = np.divmod(packed, count)
+        else:
+            positions = np.argsort(pairs, kind='stable')
+            sorted_pairs = pairs[positions]
+        first = np.empty(count, dtype=bool)
+        first[0] = True
+        np.not_equal(sorted_pairs[1:], sorted_pairs[:-1], out=first[1:])
+        return positions[first]
+
+    @staticmethod
+    def _point_biserial(users, questions, correct, size: int, min_responses: int):
+        """
+        Correlate each response with the learner's score on their other
+        questions (the corrected point-biserial), from grouped sums of x, y,
+        xy and y² per question id. Learners with a single response are left out.
+        """
+        user_responses = np.bincount(users)
+        user_correct = np.bincount(users, weights=correct)
+        others = user_responses[users] - 1
+        mask = others > 0
+        x = correct[mask]
+        y = (user_correct[users][mask] - x) / others[mask]
+        q = questions[mask]
+
+        n = np.bincount(q, minlength=size).astype(np.float64)
+        sum_x = np.bincount(q, weights=x, minlength=size)
+        sum_y = np.bincount(q, weights=y, minlength=size)
+        sum_xy = np.bincount(q, weights=x * y, minlength=size)
+        sum_yy = np.bincount(q, weights=y * y, minlength=size)
+
+        # x is 0 or 1, so the sum of x² is the sum of x
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = (n * sum_xy - sum_x * sum_y) / np.sqrt((n * sum_x - sum_x ** 2) * (n * sum_yy - sum_y ** 2))
+        r[(n < min_responses) | ~np.isfinite(r)] = np.nan
+        return np.round(r, 4)
+
+    @staticmethod
+    def _choice_rates(questions, choices):
+        """Count the selections of each choice among the single-choice responses of its question."""
+        selected = choices != 0
+        choices, questions = choices[selected], questions[selected]
+        if not len(choices):
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty, np.empty(0)
+        selections = np.bincount(choices)
+        choice_ids = np.flatnonzero(selections)
+        # Every attempt at a choice is at the choice's own question
+        choice_questions = np.zeros(len(selections), dtype=np.int64)
+        choice_questions[choices] = questions
+        choice_questions = choice_questions[choice_ids]
+        answered = np.bincount(questions)
+        rates = np.round(selections[choice_ids] / answered[choice_questions], 4)
+        return choice_ids, choice_questions, selections[choice_ids], rates
+
+    def _store(self, question_rows: List[Dict[str, Any]], choice_rows: List[Dict[str, Any]]) -> None:
+        """Replace the stored stats in one transaction, skipping content deleted since the load."""
+        try:
+            db.session.execute(delete(ChoiceStats))
+            db.session.execute(delete(QuestionStats))
+            existing_questions = set(db.session.execute(select(Question.id)).scalars())
+            existing_choices = set(db.session.execute(select(QuestionChoice.id)).scalars())
+            question_rows = [row for row in question_rows if row['question_id'] in existing_questions]
+            choice_rows = [row for row in choice_rows if row['choice_id'] in existing_choices]
+            for model, rows in ((QuestionStats, question_rows), (ChoiceStats, choice_rows)):
+                for start in range(0, len(rows), STATS_INSERT_BATCH_SIZE):
+                    db.session.execute(insert(model.__table__), rows[start:start + STATS_INSERT_BATCH_SIZE])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def get_page(self, section_id: Optional[int] = None, level_id: Optional[int] = None,
+                 after_id: Optional[int] = None, limit: int = 50) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Get one page of question stats with the stats of their choices and the
+        flags of questions that look too easy, too hard or misleading,
+        optionally filtered by section and/or level. Runs two queries per page.
+        """
+        stmt = (
+            select(QuestionStats.question_id.label('id'), Question.section_id, QuestionStats.responses,
+                   QuestionStats.p_value, QuestionStats.discrimination, QuestionStats.computed_at)
+            .join(Question, Question.id == QuestionStats.question_id)
+        )
+        if section_id:
+            stmt = stmt.where(Question.section_id == section_id)
+        if level_id:
+            stmt = stmt.join(Section, Question.section_id == Section.id).where(Section.level_id == level_id)
+        rows, next_cursor = paginate(stmt, QuestionStats.question_id, after_id, limit)
+
+        choices: Dict[int, List[Dict[str, Any]]] = {row.id: [] for row in rows}
+        if choices:
+            choice_stmt = (
+                select(QuestionChoice.id, QuestionChoice.question_id, QuestionChoice.is_correct,
+                       ChoiceStats.selections, ChoiceStats.selection_rate)
+                .outerjoin(ChoiceStats, ChoiceStats.choice_id == QuestionChoice.id)
+                .where(QuestionChoice.question_id.in_(list(choices)))
+                .order_by(QuestionChoice.id)
+            )
+            for choice in db.session.execute(choice_stmt):
+                choices[choice.question_id].append({
+                    'choice_id': choice.id,
+                    'is_correct': choice.is_correct,
+                    'selections': choice.selections or 0,
+                    'selection_rate': choice.selection_rate or 0.0
+                })
+
+        stats = []
+        for row in rows:
+            stats.append({
+                'question_id': row.id,
+                'section_id': row.section_id,
+                'responses': row.responses,
+                'p_value': row.p_value,
+                'discrimination': row.discrimination,
+                'computed_at': row.computed_at.isoformat(),
+                'flags': self._flags(row.p_value, row.discrimination, choices[row.id]),
+                'choices': choices[row.id]
+            })
+        return stats, next_cursor
+
+    @staticmethod
+    def _flags(p_value: float, discrimination: Optional[float], choices: List[Dict[str, Any]]) -> List[str]:
+        flags = []
+        if p_value >= TOO_EASY_P_VALUE:
+            flags.append('too_easy')
+        if p_value <= TOO_HARD_P_VALUE:
+            flags.append('too_hard')
+        if discrimination is not None and discrimination < LOW_DISCRIMINATION:
+            flags.append('low_discrimination')
+        # A wrong choice picked more often than every correct one
+        correct_rates = [choice['selection_rate'] for choice in choices if choice['is_correct']]
+        if correct_rates and any(not choice['is_correct'] and choice['selection_rate'] > max(correct_rates)
+                                 for choice in choices):
+            flags.append('misleading_choice')
+        return flags
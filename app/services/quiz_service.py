@@ -0,0 +1,70 @@
+import hashlib
+import random
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.models.question import Question, QuestionChoice
+from app.models.read_models import IN_CHUNK_SIZE, QuestionView, ChoiceView, attach_choices
+from app.utils.quiz_pool_cache import quiz_pool_cache
+
+# Default number of questions in a quiz
+QUIZ_SIZE_DEFAULT = 10
+
+# Fields sent to learners: the correct answers stay on the server for grading
+QUIZ_QUESTION_FIELDS = ('id', 'section_id', 'question_type', 'question_content', 'answer_type', 'choices')
+QUIZ_CHOICE_FIELDS = ('id', 'choice_type', 'content')
+
+
+class QuizService:
+    """Build randomized quizzes from the cached question ids of a section or level."""
+
+    def build_quiz(self, scope: str, scope_id: int, user_id: int, size: int,
+                   seed: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Sample ``size`` questions of a section or level (``scope`` is 'section'
+        or 'level') and shuffle their choices. The sample is drawn in memory
+        from the cached question ids and seeded from the user, the scope and
+        ``seed`` (today's date by default), so a retry returns the same quiz.
+        Only the chosen questions are then fetched, by primary key.
+        Returns None if the section or level does not exist.
+        """
+        pool = quiz_pool_cache.get((scope, scope_id))
+        if pool is None:
+            return None
+
+        seed = seed or datetime.utcnow().date().isoformat()
+        digest = hashlib.sha256(f'{user_id}:{scope}:{scope_id}:{seed}'.encode()).digest()
+        rng = random.Random(int.from_bytes(digest[:8], 'big'))
+        chosen = rng.sample(pool, min(size, len(pool)))
+
+        questions = self._fetch(chosen)
+        for question in questions:
+            rng.shuffle(question.choices)
+        return {
+            scope + '_id': scope_id,
+            'seed': seed,
+            'available': len(pool),
+            'questions': [question.to_dict() for question in questions]
+        }
+
+    def _fetch(self, question_ids: List[int]) -> List[QuestionView]:
+        """Fetch questions and their choices by primary key, in the given order."""
+        if not question_ids:
+            return []
+        questions = QuestionView.fetch(
+            QuestionView.select(QUIZ_QUESTION_FIELDS).where(Question.id.in_(question_ids)),
+            QUIZ_QUESTION_FIELDS
+        )
+        choices = []
+        for start in range(0, len(question_ids), IN_CHUNK_SIZE):
+            choices += ChoiceView.fetch(
+                ChoiceView.select(QUIZ_CHOICE_FIELDS)
+                .where(QuestionChoice.question_id.in_(question_ids[start:start + IN_CHUNK_SIZE]))
+                .order_by(QuestionChoice.id),
+                QUIZ_CHOICE_FIELDS
+            )
+        attach_choices(questions, choices)
+
+        # Questions deleted since the ids were cached are skipped
+        by_id = {question.id: question for question in questions}
+        return [by_id[question_id] for question_id in question_ids if question_id in by_id]
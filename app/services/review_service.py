@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, insert, select, tuple_, update
+
+from app import db
+from app.models.question import Question
+from app.models.review_item import ReviewItem
+from app.models.read_models import IN_CHUNK_SIZE, QuestionView, attach_choices
+
+# SM-2 answer quality: 5 is a perfect answer, below 3 a failed recall
+QUALITY_CORRECT = 5
+QUALITY_TYPO = 4
+QUALITY_INCORRECT = 1
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+# A graded answer to review: user id, question id, quality and time of the answer
+Review = Tuple[int, int, int, datetime]
+
+_REVIEW_FIELDS = ('ease', 'interval_days', 'repetitions', 'lapses', 'due_at', 'last_reviewed_at')
+
+
+def answer_quality(correct: bool, typos: Optional[int] = None) -> int:
+    """ Map a graded answer to an SM-2 quality. """
+    if not correct:
+        return QUALITY_INCORRECT
+    return QUALITY_TYPO if typos else QUALITY_CORRECT
+
+
+class ReviewService:
+    """Spaced-repetition scheduling (SM-2) of the questions a user has answered."""
+
+    @staticmethod
+    def schedule(state: Optional[Dict[str, Any]], quality: int, reviewed_at: datetime) -> Dict[str, Any]:
+        """
+        Get the next review state of a question after an answer of the given
+        quality. ``state`` is None for a question answered for the first time.
+        """
+        ease = state['ease'] if state else DEFAULT_EASE
+        interval_days = state['interval_days'] if state else 0
+        repetitions = state['repetitions'] if state else 0
+        lapses = state['lapses'] if state else 0
+
+        if quality >= 3:
+            if repetitions == 0:
+                interval_days = 1
+            elif repetitions == 1:
+                interval_days = 6
+            else:
+                interval_days = max(1, round(interval_days * ease))
+            repetitions += 1
+        else:
+            if repetitions > 0:
+                lapses += 1
+            repetitions = 0
+            interval_days = 1
+        ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+        return {
+            'ease': round(ease, 4),
+            'interval_days': interval_days,
+            'repetitions': repetitions,
+            'lapses': lapses,
+            'due_at': reviewed_at + timedelta(days=interval_days),
+            'last_reviewed_at': reviewed_at
+        }
+
+    def apply_reviews(self, reviews: Sequence[Review]) -> Dict[Tuple[int, int], bool]:
+        """
+        Reschedule the answered questions in the current transaction. The
+        existing states are read with one IN query per IN_CHUNK_SIZE pairs and
+        written back with one executemany update and one executemany insert.
+        Returns whether the previous answer was correct for every
+        (user_id, question_id) pair that had already been answered.
+        """
+        if not reviews:
+            return {}
+        keys = list(dict.fromkeys((user_id, question_id) for user_id, question_id, _, _ in reviews))
+        states: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        columns = [getattr(ReviewItem, field) for field in _REVIEW_FIELDS]
+        for start in range(0, len(keys), IN_CHUNK_SIZE):
+            stmt = (
+                select(ReviewItem.user_id, ReviewItem.question_id, *columns)
+                .where(tuple_(ReviewItem.user_id, ReviewItem.question_id).in_(keys[start:start + IN_CHUNK_SIZE]))
+            )
+            for row in db.session.execute(stmt):
+                states[(row.user_id, row.question_id)] = {field: getattr(row, field) for field in _REVIEW_FIELDS}
+        # Failed answers reset the repetitions, so they are positive exactly when the latest answer was correct
+        previous = {key: state['repetitions'] > 0 for key, state in states.items()}
+
+        # Answers are applied in order, so repeated answers to a question in one batch compound
+        for user_id, question_id, quality, reviewed_at in reviews:
+            key = (user_id, question_id)
+            states[key] = self.schedule(states.get(key), quality, reviewed_at)
+
+        table = ReviewItem.__table__
+        updates = [dict(state, key_user_id=key[0], key_question_id=key[1])
+                   for key, state in states.items() if key in previous]
+        inserts = [dict(state, user_id=key[0], question_id=key[1])
+                   for key, state in states.items() if key not in previous]
+        if updates:
+            db.session.execute(
+                update(table)
+                .where(table.c.user_id == bindparam('key_user_id'),
+                       table.c.question_id == bindparam('key_question_id'))
+                .values({field: bindparam(field) for field in _REVIEW_FIELDS}),
+                updates
+            )
+        if inserts:
+            db.session.execute(insert(table), inserts)
+        return previous
+
+    @staticmethod
+    def get_answered(user_id: int, question_ids: Sequence[int]) -> Dict[int, bool]:
+        """Get whether the latest answer was correct for the given questions a user has answered."""
+        answered = {}
+        question_ids = list(question_ids)
+        for start in range(0, len(question_ids), IN_CHUNK_SIZE):
+            stmt = (
+                select(ReviewItem.question_id, ReviewItem.repetitions)
+                .where(ReviewItem.user_id == user_id,
+                       ReviewItem.question_id.in_(question_ids[start:start + IN_CHUNK_SIZE]))
+            )
+            for question_id, repetitions in db.session.execute(stmt):
+                answered[question_id] = repetitions > 0
+        return answered
+
+    def get_due(self, user_id: int, limit: int = 20, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Get the questions due for review, most overdue first, with their review
+        state. Reads a range of the (user_id, due_at) index joined with the
+        questions by primary key, plus one query for the choices.
+        """
+        now = now or datetime.utcnow()
+        stmt = (
+            QuestionView.select()
+            .add_columns(ReviewItem.due_at.label('review_due_at'), ReviewItem.interval_days.label('review_interval_days'),
+                         ReviewItem.repetitions.label('review_repetitions'), ReviewItem.ease.label('review_ease'))
+            .select_from(ReviewItem)
+            .join(Question, Question.id == ReviewItem.question_id)
+            .where(ReviewItem.user_id == user_id, ReviewItem.due_at <= now)
+            .order_by(ReviewItem.due_at)
+            .limit(limit)
+        )
+        rows = db.session.execute(stmt).all()
+        questions = [QuestionView(row) for row in rows]
+        attach_choices(questions)
+
+        items = []
+        for row, question in zip(rows, questions):
+            data = question.to_dict()
+            data['review'] = {
+                'due_at': row.review_due_at.isoformat(),
+                'interval_days': row.review_interval_days,
+                'repetitions': row.review_repetitions,
+                'ease': row.review_ease
+            }
+            items.append(data)
+        return items
@@ -1,14 +1,18 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from werkzeug.datastructures import FileStorage
 from werkzeug.exceptions import BadRequest
 
 from app.models.section import Section
+from app.models.question import Question
+from app.models.read_models import SectionView
 from app.services.base_service import BaseService
-from app.utils.file_upload import save_file, delete_file
+from app.services.media_service import MediaService
+from app.utils.file_upload import save_file, delete_file, release_media_many
 from app import db
+from sqlalchemy import delete
 from sqlalchemy.exc import SQLAlchemyError
-import os
-from app.utils.file_upload import get_upload_folder
+from app.utils.pagination import paginate
+from app.utils.content_cache import invalidate_section
 
 
 class SectionService(BaseService):
@@ -43,27 +47,19 @@ class SectionService(BaseService):
             return None
             
         if file:
-            # Delete old file if exists
+            # Release the old file before saving the new one: identical bytes
+            # map to the same path, which then keeps exactly one reference
             if section.image:
                 delete_file(section.image)
-            # Save new file
-            file_path = save_file(file, 'sections')
-            data['image'] = file_path
-            
+            section.image = save_file(file, 'sections')
+            data.pop('image', None)
+
         return self.update(section_id, data)
     
     def delete_section(self, section_id: int) -> bool:
         """
         Delete a section and its associated file.
         """
-        section = self.get_by_id(section_id)
-        if not section:
-            return False
-            
-        # Delete associated file if exists
-        if section.image:
-            delete_file(section.image)
-            
         return self.delete(section_id)
     
     def get_sections_by_level(self, level_id: int) -> List[Section]:
@@ -72,6 +68,27 @@ class SectionService(BaseService):
         """
         return self.query().filter_by(level_id=level_id).all()
 
+    def get_page(self, level_id: Optional[int] = None, after_id: Optional[int] = None, limit: int = 50,
+                 fields: Optional[str] = None) -> Tuple[List[SectionView], Optional[str]]:
+        """
+        Get one page of read-only sections, optionally filtered by level
+        and restricted to the given comma-separated fields.
+        """
+        fields = SectionView.parse_fields(fields)
+        stmt = SectionView.select(fields)
+        if level_id:
+            stmt = stmt.where(Section.level_id == level_id)
+        rows, next_cursor = paginate(stmt, Section.id, after_id, limit)
+        return [SectionView(row, fields) for row in rows], next_cursor
+
+    def get_view(self, section_id: int, fields: Optional[str] = None) -> Optional[SectionView]:
+        """
+        Get a read-only section by ID, restricted to the given comma-separated fields.
+        """
+        fields = SectionView.parse_fields(fields)
+        sections = SectionView.fetch(SectionView.select(fields).where(Section.id == section_id), fields)
+        return sections[0] if sections else None
+
     @staticmethod
     def get_all():
         sections = Section.query.all()
@@ -93,6 +110,7 @@ class SectionService(BaseService):
             )
             db.session.add(section)
             db.session.commit()
+            invalidate_section(section.id, [section.level_id])
             return section
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -104,22 +122,17 @@ class SectionService(BaseService):
             section = Section.query.get(section_id)
             if not section:
                 return None
+            old_level_id = section.level_id
 
-            # If updating image, delete old image file
-            if 'image' in data and section.image:
-                try:
-                    filename = os.path.basename(section.image)
-                    folder = get_upload_folder('sections')
-                    old_image_path = os.path.join(folder, filename)
-                    if os.path.exists(old_image_path):
-                        os.remove(old_image_path)
-                except Exception as e:
-                    print(f"Warning: Failed to delete old image: {e}")
+            # If replacing the image, release the old image file
+            if 'image' in data and section.image and data['image'] != section.image:
+                delete_file(section.image)
 
             for key, value in data.items():
                 setattr(section, key, value)
 
             db.session.commit()
+            invalidate_section(section_id, [old_level_id, section.level_id])
             return section
         except SQLAlchemyError as e:
             db.session.rollback()
@@ -132,19 +145,18 @@ class SectionService(BaseService):
             if not section:
                 return False
 
-            # Delete associated image file
-            if section.image:
-                try:
-                    filename = os.path.basename(section.image)
-                    folder = get_upload_folder('sections')
-                    image_path = os.path.join(folder, filename)
-                    if os.path.exists(image_path):
-                        os.remove(image_path)
-                except Exception as e:
-                    print(f"Warning: Failed to delete image: {e}")
-
-            db.session.delete(section)
+            level_id = section.level_id
+            question_ids = [question_id for (question_id,) in
+                            Question.query.with_entities(Question.id).filter_by(section_id=section_id)]
+
+            # Release the media of the section and its questions; files are
+            # removed in the background once the delete is committed
+            release_media_many(MediaService().get_content_media(section_id=section_id))
+
+            # Questions and choices go with ON DELETE CASCADE
+            db.session.execute(delete(Section).where(Section.id == section_id))
             db.session.commit()
+            invalidate_section(section_id, [level_id], question_ids, deleted=True)
             return True
         except SQLAlchemyError as e:
             db.session.rollback()
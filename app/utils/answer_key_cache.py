@@ -0,0 +1,86 @@
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+from sqlalchemy import and_, select
+
+from app import db
+from app.models.section import Section
+from app.models.question import Question, QuestionChoice, AnswerType
+from app.utils.answer_matching import AnswerMatcher, DEFAULT_DIACRITIC_SCRIPTS, split_answers
+from app.utils.loading_cache import LoadingCache
+
+
+class AnswerKey:
+    """Correct answers of the questions of one section, indexed by question id."""
+
+    __slots__ = ('section_id', 'choices', 'answers', 'matchers')
+
+    def __init__(self, section_id: int):
+        self.section_id = section_id
+        # Multiple-choice questions: ids of the correct choices
+        self.choices: Dict[int, FrozenSet[int]] = {}
+        # Fill-in-the-blank questions: the first accepted answer and the compiled matcher
+        self.answers: Dict[int, str] = {}
+        self.matchers: Dict[int, AnswerMatcher] = {}
+
+    def __len__(self) -> int:
+        return len(self.choices) + len(self.answers)
+
+    def __contains__(self, question_id: int) -> bool:
+        return question_id in self.choices or question_id in self.answers
+
+    @classmethod
+    def load(cls, section_id: int, diacritic_scripts: Iterable[str] = DEFAULT_DIACRITIC_SCRIPTS,
+             max_typos: int = 1) -> Optional["AnswerKey"]:
+        """
+        Build the answer key of a section with a single query over its questions
+        joined with their correct choices. Returns None if the section does not exist.
+        """
+        stmt = (
+            select(Question.id, Question.answer_type, Question.correct_answer, QuestionChoice.id.label('choice_id'))
+            .select_from(Section)
+            .outerjoin(Question, Question.section_id == Section.id)
+            .outerjoin(QuestionChoice, and_(QuestionChoice.question_id == Question.id,
+                                            QuestionChoice.is_correct.is_(True)))
+            .where(Section.id == section_id)
+        )
+        rows = db.session.execute(stmt).all()
+        if not rows:
+            return None
+
+        key = cls(section_id)
+        choices: Dict[int, set] = {}
+        for question_id, answer_type, correct_answer, choice_id in rows:
+            if question_id is None:
+                continue
+            if answer_type == AnswerType.MULTIPLE_CHOICE:
+                correct = choices.setdefault(question_id, set())
+                if choice_id is not None:
+                    correct.add(choice_id)
+            else:
+                accepted = split_answers(correct_answer)
+                key.answers[question_id] = accepted[0] if accepted else ''
+                key.matchers[question_id] = AnswerMatcher(correct_answer, diacritic_scripts, max_typos)
+        key.choices = {question_id: frozenset(ids) for question_id, ids in choices.items()}
+        return key
+
+
+class AnswerKeyCache(LoadingCache):
+    """LRU cache of section answer keys, invalidated by the content write paths."""
+
+    def __init__(self, max_entries: int = 1000):
+        super().__init__(max_entries)
+        self.diacritic_scripts: Tuple[str, ...] = DEFAULT_DIACRITIC_SCRIPTS
+        self.max_typos = 1
+
+    def init_app(self, app) -> None:
+        """Configure the cache from the app config."""
+        self.max_entries = app.config.get('ANSWER_KEY_CACHE_MAX_ENTRIES', self.max_entries)
+        self.diacritic_scripts = tuple(app.config.get('ANSWER_DIACRITIC_SCRIPTS', self.diacritic_scripts))
+        self.max_typos = app.config.get('ANSWER_MAX_TYPOS', self.max_typos)
+        self.clear()
+
+    def load(self, section_id: int) -> Optional[AnswerKey]:
+        """Load the answer key of a section, or None if the section does not exist."""
+        return AnswerKey.load(section_id, self.diacritic_scripts, self.max_typos)
+
+
+answer_key_cache = AnswerKeyCache()
@@ -0,0 +1,181 @@
+"""
+Matching of free-text answers for grading fill-in-the-blank questions.
+
+A question's ``correct_answer`` may list several accepted answers separated by
+``|``. Each accepted answer is compiled once into its normalized form (Unicode
+NFKC, case-folded, whitespace collapsed, surrounding punctuation removed and,
+for the configured scripts, diacritics removed), so grading an answer is a set
+lookup that only falls back to a bounded edit distance on a miss. Typos are
+only tolerated in answers written in the configured scripts.
+"""
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+# Separator of the accepted answers in ``correct_answer``
+ANSWER_SEPARATOR = '|'
+
+# Scripts whose diacritics are ignored by default
+DEFAULT_DIACRITIC_SCRIPTS = ('latin', 'greek', 'cyrillic', 'arabic', 'hebrew')
+
+# Characters of an accepted answer per allowed typo; shorter answers must be exact
+CHARS_PER_TYPO = 4
+
+# Arabic tatweel, which only stretches the surrounding letters
+_TATWEEL = '\u0640'
+
+
+@lru_cache(maxsize=4096)
+def _script(char: str) -> str:
+    return unicodedata.name(char, '').split(' ', 1)[0].lower()
+
+
+def remove_diacritics(text: str, scripts: Iterable[str] = DEFAULT_DIACRITIC_SCRIPTS) -> str:
+    """
+    Remove the combining marks attached to letters of the given scripts, so
+    'é' matches 'e' and vowelled Arabic matches unvowelled Arabic, while marks
+    that change the letter in other scripts (such as Japanese dakuten) are kept.
+    """
+    scripts = frozenset(scripts)
+    if not scripts:
+        return text
+    kept = []
+    base = ''
+    for char in unicodedata.normalize('NFD', text):
+        if unicodedata.combining(char):
+            if base and _script(base) in scripts:
+                continue
+        elif char == _TATWEEL and 'arabic' in scripts:
+            continue
+        else:
+            base = char
+        kept.append(char)
+    return unicodedata.normalize('NFC', ''.join(kept))
+
+
+def _strip_punctuation(text: str) -> str:
+    start, end = 0, len(text)
+    while start < end and unicodedata.category(text[start]).startswith('P'):
+        start += 1
+    while end > start and unicodedata.category(text[end - 1]).startswith('P'):
+        end -= 1
+    return text[start:end].strip()
+
+
+def normalize_answer(answer, diacritic_scripts: Iterable[str] = ()) -> str:
+    """ Normalize an answer for comparison. Diacritics are only removed for the given scripts. """
+    if answer is None:
+        return ''
+    text = ' '.join(unicodedata.normalize('NFKC', str(answer)).split()).casefold()
+    text = _strip_punctuation(text)
+    if diacritic_scripts:
+        return remove_diacritics(text, diacritic_scripts)
+    return unicodedata.normalize('NFC', text)
+
+
+def split_answers(correct_answer: Optional[str]) -> List[str]:
+    """ Split a stored ``correct_answer`` into its accepted answers. """
+    if not correct_answer:
+        return []
+    return [answer.strip() for answer in str(correct_answer).split(ANSWER_SEPARATOR) if answer.strip()]
+
+
+def bounded_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """
+    Get the edit distance between two strings, counting insertions, deletions,
+    substitutions and transpositions of adjacent characters, or None if it is
+    above ``max_distance``. Only the diagonal band of width ``max_distance`` is
+    computed and the scan stops as soon as every cell of a row exceeds the bound.
+    """
+    if a == b:
+        return 0
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > max_distance:
+        return None
+    # Common prefixes and suffixes never add to the distance
+    start = 0
+    while start < len(a) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not a:
+        return len(b)
+
+    over = max_distance + 1
+    previous_row: List[int] = []
+    row = [j if j <= max_distance else over for j in range(len(a) + 1)]
+    for i in range(1, len(b) + 1):
+        before_row, previous_row = previous_row, row
+        row = [over] * (len(a) + 1)
+        if i <= max_distance:
+            row[0] = i
+        row_min = row[0]
+        char = b[i - 1]
+        for j in range(max(1, i - max_distance), min(len(a), i + max_distance) + 1):
+            value = min(previous_row[j] + 1, row[j - 1] + 1,
+                        previous_row[j - 1] + (a[j - 1] != char))
+            if i > 1 and j > 1 and a[j - 1] == b[i - 2] and a[j - 2] == char:
+                value = min(value, before_row[j - 2] + 1)
+            row[j] = value if value <= max_distance else over
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return None
+    return row[len(a)] if row[len(a)] <= max_distance else None
+
+
+class AnswerMatcher:
+    """The accepted answers of a question, compiled for repeated matching."""
+
+    __slots__ = ('exact', 'fuzzy', 'diacritic_scripts')
+
+    def __init__(self, correct_answer: Optional[str], diacritic_scripts: Iterable[str] = DEFAULT_DIACRITIC_SCRIPTS,
+                 max_typos: int = 1):
+        self.diacritic_scripts = tuple(diacritic_scripts)
+        forms = {normalize_answer(answer, self.diacritic_scripts) for answer in split_answers(correct_answer)}
+        forms.discard('')
+        self.exact = frozenset(forms)
+        # Answers long enough to tolerate typos, with their allowed distance and
+        # character counts. Numbers must always match exactly, and so must words
+        # of other scripts (such as kana or CJK), where one character changes the word.
+        scripts = frozenset(self.diacritic_scripts)
+        fuzzy: List[Tuple[str, int, Counter]] = []
+        for form in sorted(forms, key=len):
+            allowed = min(max_typos, len(form) // CHARS_PER_TYPO)
+            if allowed > 0 and all(not char.isdigit() and (not char.isalpha() or _script(char) in scripts)
+                                   for char in form):
+                fuzzy.append((form, allowed, Counter(form)))
+        self.fuzzy = tuple(fuzzy)
+
+    def match(self, answer) -> Optional[int]:
+        """
+        Match a submitted answer. Returns the number of typos in the closest
+        accepted answer (0 for an exact match), or None if none is close enough.
+        """
+        text = normalize_answer(answer, self.diacritic_scripts)
+        if text in self.exact:
+            return 0
+        if not text:
+            return None
+        best = None
+        counts = None
+        for form, allowed, form_counts in self.fuzzy:
+            if best is not None:
+                allowed = min(allowed, best - 1)
+            if abs(len(form) - len(text)) > allowed:
+                continue
+            # Every edit changes at most one character count on each side, so
+            # the count differences are a cheap lower bound of the distance
+            counts = counts or Counter(text)
+            if max(sum((counts - form_counts).values()), sum((form_counts - counts).values())) > allowed:
+                continue
+            distance = bounded_distance(text, form, allowed)
+            if distance is not None:
+                best = distance
+                if best == 1:
+                    break
+        return best
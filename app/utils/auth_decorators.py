@@ -1,16 +1,19 @@
 from functools import wraps
 from flask import request, jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
 from app.models.user import User, UserRole
+from app.utils.user_cache import user_cache
 
 def admin_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or user.role != UserRole.ADMIN:
+        # Tokens minted for non-admins are rejected without any lookup
+        if get_jwt().get('role', UserRole.ADMIN.value) != UserRole.ADMIN.value:
+            return jsonify({'error': 'Admin privileges required'}), 403
+
+        role = user_cache.get_role(get_jwt_identity())
+        if role != UserRole.ADMIN.value:
             return jsonify({'error': 'Admin privileges required'}), 403
         return fn(*args, **kwargs)
     return wrapper
@@ -19,10 +22,9 @@ def token_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        role = user_cache.get_role(get_jwt_identity())
         
-        if not user:
+        if role is None:
             return jsonify({'error': 'User not found'}), 404
         return fn(*args, **kwargs)
-    return wrapper 
\ No newline at end of file
+    return wrapper 
@@ -0,0 +1,144 @@
+"""
+Streaming parsers for bulk imports.
+
+Every parser reads its source incrementally and yields ``(row_number, record,
+error)`` tuples: ``record`` is a dict when the row could be parsed, otherwise
+``error`` describes why it could not. Errors that make the rest of the source
+unreadable (such as malformed JSON in an array) raise BadRequest.
+"""
+import csv
+import io
+import json
+import os
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from werkzeug.exceptions import BadRequest
+
+# Size of the text chunks read from the source
+CHUNK_SIZE = 64 * 1024
+
+IMPORT_FORMATS = ('json', 'ndjson', 'csv')
+
+_MIMETYPE_FORMATS = {
+    'application/json': 'json',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'text/csv': 'csv',
+}
+
+_EXTENSION_FORMATS = {
+    'json': 'json',
+    'ndjson': 'ndjson',
+    'jsonl': 'ndjson',
+    'csv': 'csv',
+}
+
+ImportRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def detect_format(filename: Optional[str], mimetype: Optional[str], requested: Optional[str] = None) -> str:
+    """ Get the import format from an explicit request, the file extension or the mimetype. """
+    if requested:
+        if requested not in IMPORT_FORMATS:
+            raise BadRequest(f"Unsupported import format. Supported formats: {', '.join(IMPORT_FORMATS)}")
+        return requested
+    if filename:
+        extension = os.path.splitext(filename)[1].lower().lstrip('.')
+        if extension in _EXTENSION_FORMATS:
+            return _EXTENSION_FORMATS[extension]
+    if mimetype in _MIMETYPE_FORMATS:
+        return _MIMETYPE_FORMATS[mimetype]
+    raise BadRequest(f"Unsupported import format. Supported formats: {', '.join(IMPORT_FORMATS)}")
+
+
+def iter_import_rows(stream, fmt: str) -> Iterator[ImportRow]:
+    """ Parse a binary stream in the given format. """
+    if not isinstance(stream, io.BufferedIOBase) and isinstance(stream, io.RawIOBase):
+        stream = io.BufferedReader(stream)
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'json':
+        return _iter_json_array(text)
+    if fmt == 'ndjson':
+        return _iter_ndjson(text)
+    return _iter_csv(text)
+
+
+def _iter_ndjson(text) -> Iterator[ImportRow]:
+    for row_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f"Invalid JSON: {str(e)}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "Row must be a JSON object"
+            continue
+        yield row_number, record, None
+
+
+def _iter_csv(text) -> Iterator[ImportRow]:
+    reader = csv.DictReader(text)
+    try:
+        for row_number, row in enumerate(reader, start=1):
+            yield row_number, {key: value for key, value in row.items() if key and value != ''}, None
+    except csv.Error as e:
+        raise BadRequest(f"Invalid CSV on line {reader.line_num}: {str(e)}")
+
+
+def _iter_json_array(text) -> Iterator[ImportRow]:
+    """Decode the elements of a top-level JSON array one at a time."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+
+    def fill() -> None:
+        nonlocal buffer, eof
+        chunk = text.read(CHUNK_SIZE)
+        if chunk:
+            buffer += chunk
+        else:
+            eof = True
+
+    def next_token() -> str:
+        # Drop leading whitespace and return the next character, reading more as needed
+        nonlocal buffer
+        while True:
+            buffer = buffer.lstrip()
+            if buffer or eof:
+                return buffer[:1]
+            fill()
+
+    if next_token() != '[':
+        raise BadRequest("Invalid JSON: expected an array of questions")
+    buffer = buffer[1:]
+
+    row_number = 0
+    while True:
+        token = next_token()
+        if token == ']':
+            return
+        if row_number:
+            if token != ',':
+                raise BadRequest(f"Invalid JSON after row {row_number}: expected ',' or ']'")
+            buffer = buffer[1:]
+            next_token()
+
+        while True:
+            try:
+                record, end = decoder.raw_decode(buffer)
+                if end < len(buffer) or eof or isinstance(record, (dict, list, str)):
+                    break
+                # A number or literal at the end of the buffer may continue in the next chunk
+                fill()
+            except ValueError as e:
+                if eof:
+                    raise BadRequest(f"Invalid JSON in row {row_number + 1}: {str(e)}")
+                fill()
+        buffer = buffer[end:]
+        row_number += 1
+        if isinstance(record, dict):
+            yield row_number, record, None
+        else:
+            yield row_number, None, "Row must be a JSON object"
@@ -0,0 +1,265 @@
+"""
+In-process cache of serialized JSON bodies for the content GET endpoints.
+
+Entries are tagged with the content they were built from (a level, the sections
+of a level, the questions of a section, ...). The write paths of the content
+services invalidate exactly the tags they touch, after their commit. The same
+helpers drop the cached answer keys and quiz pools of the affected sections
+and levels.
+
+Invalidation only reaches the process that made the write. Entries expire
+after RESPONSE_CACHE_TTL seconds, which bounds how long other worker
+processes keep serving content from before a write.
+"""
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional
+from flask import make_response, request
+from app.utils.answer_key_cache import answer_key_cache
+from app.utils.quiz_pool_cache import quiz_pool_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """TTL/LRU cache of response bodies bounded by their total size in bytes."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 60):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._keys_by_tag: Dict[str, set] = defaultdict(set)
+        self._generations: Dict[str, int] = defaultdict(int)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def init_app(self, app) -> None:
+        """Configure the cache from the app config."""
+        self.max_bytes = app.config.get('RESPONSE_CACHE_MAX_BYTES', self.max_bytes)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', self.ttl)
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        self.clear()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a cached body and mark it as recently used. Expired bodies are dropped."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def snapshot(self, tags: Iterable[str]) -> Dict[str, int]:
+        """Capture the generation of each tag before building a response."""
+        with self._lock:
+            return {tag: self._generations[tag] for tag in tags}
+
+    def set(self, key: str, body: bytes, snapshot: Dict[str, int]) -> bool:
+        """
+        Store a body under the tags of its snapshot.
+        The body is dropped if any of the tags was invalidated since the snapshot was taken.
+        """
+        if len(body) > self.max_bytes:
+            return False
+        with self._lock:
+            if any(self._generations[tag] != generation for tag, generation in snapshot.items()):
+                return False
+            self._remove(key)
+            self._entries[key] = (body, tuple(snapshot), time.monotonic() + self.ttl)
+            self.size += len(body)
+            for tag in snapshot:
+                self._keys_by_tag[tag].add(key)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop every entry built from any of the given tags."""
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] += 1
+                for key in self._keys_by_tag.pop(tag, ()):
+                    if self._remove(key):
+                        self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self.size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the hit/miss counters and the current size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'size_bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        body, tags, _ = entry
+        self.size -= len(body)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+        return True
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(get_tags: Callable[..., Iterable[str]]):
+    """
+    Cache the JSON body of a successful GET view.
+    ``get_tags`` receives the view arguments and returns the tags of the content it reads.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not response_cache.enabled:
+                return fn(*args, **kwargs)
+
+            key = f"{request.path}?{'&'.join(sorted(f'{k}={v}' for k, v in request.args.items(multi=True)))}"
+            body = response_cache.get(key)
+            if body is not None:
+                response = make_response(body)
+                response.mimetype = 'application/json'
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            snapshot = response_cache.snapshot(get_tags(**kwargs))
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code == 200 and response.mimetype == 'application/json':
+                response_cache.set(key, response.get_data(), snapshot)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+# Tags of the content read by each GET endpoint
+
+def level_list_tags(**kwargs):
+    return ['levels']
+
+
+def level_tags(level_id, **kwargs):
+    return [f'level:{level_id}']
+
+
+def level_tree_tags(level_id, **kwargs):
+    return [f'level:{level_id}', f'sections:level:{level_id}', f'questions:level:{level_id}']
+
+
+def section_list_tags(**kwargs):
+    level_id = request.args.get('level_id', type=int)
+    return [f'sections:level:{level_id}'] if level_id else ['sections']
+
+
+def section_tags(section_id, **kwargs):
+    return [f'section:{section_id}']
+
+
+def question_list_tags(**kwargs):
+    section_id = request.args.get('section_id', type=int)
+    level_id = request.args.get('level_id', type=int)
+    tags = []
+    if section_id:
+        tags.append(f'questions:section:{section_id}')
+    if level_id:
+        tags.append(f'questions:level:{level_id}')
+    return tags or ['questions']
+
+
+def question_tags(question_id, **kwargs):
+    return [f'question:{question_id}']
+
+
+# Invalidation helpers for the write paths
+
+def invalidate_level(level_id: int, section_ids: Iterable[int] = (), question_ids: Iterable[int] = (),
+                     deleted: bool = False) -> None:
+    """Invalidate a level. When it was deleted, also invalidate its cascaded sections and questions."""
+    tags = ['levels', f'level:{level_id}']
+    if deleted:
+        tags += ['sections', f'sections:level:{level_id}', 'questions', f'questions:level:{level_id}']
+        tags += [f'section:{section_id}' for section_id in section_ids]
+        tags += [f'questions:section:{section_id}' for section_id in section_ids]
+        tags += [f'question:{question_id}' for question_id in question_ids]
+        answer_key_cache.invalidate(section_ids)
+        quiz_pool_cache.invalidate_sections(section_ids)
+        quiz_pool_cache.invalidate_levels([level_id])
+    response_cache.invalidate(*tags)
+
+
+def invalidate_section(section_id: int, level_ids: Iterable[Optional[int]], question_ids: Iterable[int] = (),
+                       deleted: bool = False) -> None:
+    """
+    Invalidate a section in the given levels (old and new level when it moved).
+    When it was deleted, also invalidate its cascaded questions.
+    """
+    level_ids = {level_id for level_id in level_ids if level_id}
+    tags = ['sections', f'section:{section_id}']
+    tags += [f'sections:level:{level_id}' for level_id in level_ids]
+    if deleted or len(level_ids) > 1:
+        tags += [f'questions:level:{level_id}' for level_id in level_ids]
+        quiz_pool_cache.invalidate_levels(level_ids)
+    if deleted:
+        tags += ['questions', f'questions:section:{section_id}']
+        tags += [f'question:{question_id}' for question_id in question_ids]
+        answer_key_cache.invalidate([section_id])
+        quiz_pool_cache.invalidate_sections([section_id])
+    response_cache.invalidate(*tags)
+
+
+def invalidate_question(question_id: int, section_ids: Iterable[Optional[int]]) -> None:
+    """Invalidate a question (including its choices) in the given sections and their levels."""
+    invalidate_questions([question_id], section_ids)
+
+
+def invalidate_questions(question_ids: Iterable[int], section_ids: Iterable[Optional[int]]) -> None:
+    """Invalidate several questions (including their choices) in the given sections and their levels."""
+    from app.models.section import Section
+
+    section_ids = {section_id for section_id in section_ids if section_id}
+    tags = ['questions']
+    tags += [f'question:{question_id}' for question_id in question_ids]
+    tags += [f'questions:section:{section_id}' for section_id in section_ids]
+    level_ids = []
+    if section_ids:
+        level_ids = Section.query.with_entities(Section.level_id).filter(Section.id.in_(section_ids)).all()
+        level_ids = [level_id for (level_id,) in level_ids]
+        tags += [f'questions:level:{level_id}' for level_id in level_ids]
+    response_cache.invalidate(*tags)
+    answer_key_cache.invalidate(section_ids)
+    quiz_pool_cache.invalidate_sections(section_ids)
+    quiz_pool_cache.invalidate_levels(level_ids)
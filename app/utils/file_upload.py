@@ -1,20 +1,82 @@
 import os
-import uuid
-from typing import Optional
+import hashlib
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
 from werkzeug.datastructures import FileStorage
-from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge, HTTPException
 from flask import current_app
+from sqlalchemy import bindparam, event, select, update, delete
+from sqlalchemy.orm import Session
+from app import db
+from app.models.media_object import MediaObject
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Size of the chunks copied from the upload stream to disk
+CHUNK_SIZE = 64 * 1024
+
+# Magic bytes of the supported file types. Each extension lists alternative
+# signatures; a signature is a list of (offset, bytes) that must all match.
+MAGIC_SIGNATURES = {
+    'png': [[(0, b'\x89PNG\r\n\x1a\n')]],
+    'jpg': [[(0, b'\xff\xd8\xff')]],
+    'jpeg': [[(0, b'\xff\xd8\xff')]],
+    'gif': [[(0, b'GIF87a')], [(0, b'GIF89a')]],
+    'webp': [[(0, b'RIFF'), (8, b'WEBP')]],
+    'pdf': [[(0, b'%PDF-')]],
+    'doc': [[(0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1')]],
+    'docx': [[(0, b'PK\x03\x04')]],
+    'mp3': [[(0, b'ID3')], [(0, b'\xff\xfb')], [(0, b'\xff\xf3')], [(0, b'\xff\xf2')]],
+    'wav': [[(0, b'RIFF'), (8, b'WAVE')]],
+    'ogg': [[(0, b'OggS')]],
+    'm4a': [[(4, b'ftyp')]],
+}
+
+# Extensions accepted when ALLOWED_EXTENSIONS is not configured
+DEFAULT_ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'doc', 'docx'}
+
+# Number of leading bytes needed to check every signature
+MAGIC_HEADER_SIZE = 16
+
+# Maximum number of paths bound into one IN clause
+MEDIA_IN_CHUNK_SIZE = 500
+
+# Files are unlinked off the request thread once their transaction committed
+_unlink_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='media-unlink')
+
+# Uploads are spread over two levels of sub-directories named after the first
+# characters of the file name, e.g. questions/ab/cd/abcd....png
+SHARD_WIDTH = 2
+SHARD_DEPTH = 2
+
+
 class FileUploadError(Exception):
     """Custom exception for file upload errors."""
     pass
 
 
-def get_upload_folder(folder: str) -> str:
-    """ Get the absolute path to the upload folder. """
+def shard_dirs(filename: str) -> List[str]:
+    """ Get the shard sub-directories of a stored file name. """
+    stem = os.path.splitext(filename)[0]
+    if len(stem) < SHARD_WIDTH * SHARD_DEPTH:
+        return []
+    return [stem[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(SHARD_DEPTH)]
+
+
+def is_content_addressed(filename: str) -> bool:
+    """ Check whether a stored file is named by the SHA-256 of its content. """
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    return len(stem) == 64 and all(c in '0123456789abcdef' for c in stem)
+
+
+def get_upload_folder(folder: str, filename: Optional[str] = None) -> str:
+    """
+    Get the absolute path to the upload folder, or to the shard
+    directory of ``filename`` inside it when given.
+    """
     try:
         # Ensure UPLOAD_FOLDER is configured
         if 'UPLOAD_FOLDER' not in current_app.config:
@@ -22,6 +84,8 @@ def get_upload_folder(folder: str) -> str:
         
         # Create the full path
         upload_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], folder)
+        if filename:
+            upload_dir = os.path.join(upload_dir, *shard_dirs(filename))
         
         # Create directory if it doesn't exist
         os.makedirs(upload_dir, exist_ok=True)
@@ -41,69 +105,256 @@ def validate_file_upload(file: FileStorage, allowed_extensions: Optional[set] =
     if not file.filename:
         raise BadRequest("No file selected")
     
-    if allowed_extensions is None:
-        allowed_extensions = current_app.config.get('ALLOWED_EXTENSIONS', {
-            'png', 'jpg', 'jpeg', 'gif', 'pdf', 'doc', 'docx'
-        })
-    
     # Check file extension
-    file_ext = os.path.splitext(file.filename)[1].lower().lstrip('.')
-    if file_ext not in allowed_extensions:
-        raise BadRequest(f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}")
+    check_extension(os.path.splitext(file.filename)[1], allowed_extensions)
     
-    # Check file size
+    # Size and content are checked while the file is streamed to disk by save_file
+    logger.info(f"File validated successfully: {file.filename}")
+
+
+def check_extension(file_ext: str, allowed_extensions: Optional[set] = None) -> None:
+    """ Reject a file extension that is not in ALLOWED_EXTENSIONS. """
+    if allowed_extensions is None:
+        allowed_extensions = current_app.config.get('ALLOWED_EXTENSIONS', DEFAULT_ALLOWED_EXTENSIONS)
+    if file_ext.lower().lstrip('.') not in allowed_extensions:
+        raise BadRequest(f"File type not allowed. Allowed types: {', '.join(sorted(allowed_extensions))}")
+
+
+def matches_signature(header: bytes, file_ext: str) -> bool:
+    """
+    Check the leading bytes of a file against the magic bytes of its extension.
+    Types without a known signature never match, since their content can't be verified.
+    """
+    signatures = MAGIC_SIGNATURES.get(file_ext)
+    if signatures is None:
+        return False
+    return any(
+        all(header[offset:offset + len(magic)] == magic for offset, magic in signature)
+        for signature in signatures
+    )
+
+
+def stream_to_temp_file(file: FileStorage, upload_dir: str, file_ext: str) -> Tuple[str, str, int]:
+    """
+    Copy an upload to a temporary file in the target directory in a single pass,
+    enforcing the size limit, hashing the content and checking the magic bytes
+    against the extension, which must be in ALLOWED_EXTENSIONS. Returns the
+    temporary path, the SHA-256 hex digest and the size of the file.
+    """
+    check_extension(file_ext)
     max_size = current_app.config.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024)  # 16MB default
-    file_content = file.read()
-    file_size = len(file_content)
-    file.seek(0)  # Reset file pointer
-    
-    if file_size > max_size:
-        raise RequestEntityTooLarge(f"File size exceeds maximum limit of {max_size / (1024 * 1024)}MB")
-    
-    logger.info(f"File validated successfully: {file.filename} ({file_size} bytes)")
+    fd, tmp_path = tempfile.mkstemp(dir=upload_dir, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            sha256 = hashlib.sha256()
+            header = b''
+            size = 0
+            while True:
+                chunk = file.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if len(header) < MAGIC_HEADER_SIZE:
+                    header += chunk[:MAGIC_HEADER_SIZE - len(header)]
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise RequestEntityTooLarge(f"File size exceeds maximum limit of {max_size / (1024 * 1024)}MB")
+                sha256.update(chunk)
+                tmp.write(chunk)
+
+        if size == 0:
+            raise BadRequest("Uploaded file is empty")
+        if not matches_signature(header, file_ext.lstrip('.')):
+            raise BadRequest("File content does not match its extension")
+        return tmp_path, sha256.hexdigest(), size
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def get_media_path(file_path: str) -> str:
+    """ Get the absolute path of a stored file from its relative ``uploads/...`` database path. """
+    relative_path = os.path.relpath(os.path.normpath(file_path), 'uploads')
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], relative_path)
 
 
 def save_file(file: FileStorage, folder: str) -> str:
-    """ Save an uploaded file to the specified folder.  """
+    """
+    Save an uploaded file to the specified folder under the hash of its content
+    and acquire a reference to it. Identical uploads share a single file.
+    The reference is committed with the caller's transaction.
+    """
     try:
         # Create upload directory if it doesn't exist
         upload_dir = get_upload_folder(folder)
         
-        # Generate unique filename
-        file_ext = os.path.splitext(file.filename)[1].lower()
-        unique_filename = f"{uuid.uuid4().hex}{file_ext}"
-        file_path = os.path.join(upload_dir, unique_filename)
-        
-        # Save file
-        file.save(file_path)
+        # Stream the upload to a temporary file, then move it into place atomically.
+        # An existing copy is overwritten with identical bytes, which also restores
+        # a file that went missing while still referenced.
+        file_ext = os.path.splitext(file.filename or '')[1].lower()
+        tmp_path, content_hash, size = stream_to_temp_file(file, upload_dir, file_ext)
+        filename = f"{content_hash}{file_ext}"
+        relative_path = os.path.join('uploads', folder, *shard_dirs(filename), filename)
+        try:
+            # The reference is taken first: it locks the media row until commit,
+            # so a concurrent release of the last reference can't unlink the file
+            # after it was moved into place
+            acquire_media(relative_path, size)
+            os.replace(tmp_path, os.path.join(get_upload_folder(folder, filename), filename))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
         
         # Return relative path for database storage
-        relative_path = os.path.join('uploads', folder, unique_filename)
         logger.info(f"File saved successfully: {relative_path}")
         return relative_path
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to save file: {str(e)}")
         raise FileUploadError(f"Failed to save file: {str(e)}")
 
 
 def delete_file(file_path: str) -> None:
-    """ Delete a file from the filesystem. """
+    """
+    Release a reference to a stored file. The file is removed from disk once the
+    transaction dropping its last reference is committed.
+    """
     try:
         if not file_path:
             logger.warning("No file path provided for deletion")
             return
-            
-        # Construct full path
-        full_path = os.path.join(current_app.root_path, 'static', file_path)
-        
-        # Check if file exists
-        if not os.path.exists(full_path):
-            logger.warning(f"File not found for deletion: {full_path}")
-            return
-            
-        # Delete file
-        os.remove(full_path)
-        logger.info(f"File deleted successfully: {file_path}")
+        release_media(file_path)
     except Exception as e:
         logger.error(f"Failed to delete file {file_path}: {str(e)}")
-        raise FileUploadError(f"Failed to delete file: {str(e)}") 
\ No newline at end of file
+        raise FileUploadError(f"Failed to delete file: {str(e)}")
+
+
+def acquire_media(file_path: str, size: Optional[int] = None) -> None:
+    """ Add a reference to a stored file in the current transaction. """
+    result = db.session.execute(
+        update(MediaObject)
+        .where(MediaObject.path == file_path)
+        .values(ref_count=MediaObject.ref_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.session.add(MediaObject(path=file_path, ref_count=1, size=size))
+        db.session.flush()
+
+
+def release_media(file_path: str) -> None:
+    """
+    Drop a reference to a stored file in the current transaction. Whether it was
+    the last reference is decided when the transaction commits, so releasing and
+    re-acquiring the same file within one transaction keeps it.
+    """
+    result = db.session.execute(
+        update(MediaObject)
+        .where(MediaObject.path == file_path)
+        .values(ref_count=MediaObject.ref_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        # Files stored before reference counting have a single owner
+        db.session.info.setdefault('media_unlink', set()).add(get_media_path(file_path))
+    else:
+        db.session.info.setdefault('media_released', set()).add(file_path)
+
+
+def release_media_many(file_paths: Iterable[str]) -> None:
+    """
+    Drop one reference for every occurrence of the given paths in the current
+    transaction, using a single executemany UPDATE. Used when deleting whole
+    levels or sections.
+    """
+    counts = Counter(path for path in file_paths if path)
+    if not counts:
+        return
+    paths = list(counts)
+    tracked = set()
+    for chunk in _chunks(paths):
+        tracked.update(db.session.execute(select(MediaObject.path).where(MediaObject.path.in_(chunk))).scalars())
+
+    if tracked:
+        table = MediaObject.__table__
+        db.session.execute(
+            update(table)
+            .where(table.c.path == bindparam('media_path'))
+            .values(ref_count=table.c.ref_count - bindparam('media_refs')),
+            [{'media_path': path, 'media_refs': counts[path]} for path in tracked]
+        )
+        db.session.info.setdefault('media_released', set()).update(tracked)
+
+    # Files stored before reference counting have a single owner
+    untracked = [path for path in paths if path not in tracked]
+    if untracked:
+        db.session.info.setdefault('media_unlink', set()).update(get_media_path(path) for path in untracked)
+
+
+def _chunks(items: List[str]) -> Iterator[List[str]]:
+    for start in range(0, len(items), MEDIA_IN_CHUNK_SIZE):
+        yield items[start:start + MEDIA_IN_CHUNK_SIZE]
+
+
+def _unlink_files(full_paths: List[str]) -> None:
+    for full_path in full_paths:
+        try:
+            os.remove(full_path)
+            logger.info(f"File deleted successfully: {full_path}")
+        except FileNotFoundError:
+            logger.warning(f"File not found for deletion: {full_path}")
+        except OSError as e:
+            logger.error(f"Failed to delete file {full_path}: {str(e)}")
+
+
+def _unlink_unreferenced(app, paths: List[str]) -> None:
+    """
+    Delete the media rows and files of released paths that are still
+    unreferenced. The rows are re-checked under a row lock, which uploads of
+    the same content take before writing the file, so a file re-acquired
+    since the release is kept.
+    """
+    with app.app_context():
+        table = MediaObject.__table__
+        for chunk in _chunks(paths):
+            try:
+                with db.engine.begin() as connection:
+                    unreferenced = connection.execute(
+                        select(table.c.path).where(table.c.path.in_(chunk), table.c.ref_count <= 0).with_for_update()
+                    ).scalars().all()
+                    if unreferenced:
+                        connection.execute(delete(table).where(table.c.path.in_(unreferenced)))
+                        _unlink_files([get_media_path(path) for path in sorted(unreferenced)])
+            except Exception as e:
+                logger.error(f"Failed to remove unreferenced media: {str(e)}")
+
+
+@event.listens_for(Session, 'before_commit')
+def _collect_unreferenced_media(session):
+    released = session.info.pop('media_released', None)
+    if not released:
+        return
+    for chunk in _chunks(list(released)):
+        unreferenced = session.execute(
+            select(MediaObject.path).where(MediaObject.path.in_(chunk), MediaObject.ref_count <= 0)
+        ).scalars().all()
+        session.info.setdefault('media_unreferenced', set()).update(unreferenced)
+
+
+@event.listens_for(Session, 'after_commit')
+def _unlink_unreferenced_media(session):
+    # Removing many files must not hold up the response. Files left behind
+    # if the process exits first are removed by collect-media-garbage.
+    unreferenced = session.info.pop('media_unreferenced', None)
+    if unreferenced:
+        _unlink_executor.submit(_unlink_unreferenced, current_app._get_current_object(), sorted(unreferenced))
+    full_paths = session.info.pop('media_unlink', None)
+    if full_paths:
+        _unlink_executor.submit(_unlink_files, sorted(full_paths))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_released_media(session):
+    session.info.pop('media_released', None)
+    session.info.pop('media_unreferenced', None)
+    session.info.pop('media_unlink', None) 
\ No newline at end of file
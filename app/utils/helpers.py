@@ -2,4 +2,8 @@ import random
 import string
 
 def generate_verification_code():
-    return ''.join(random.choices(string.digits, k=6))
\ No newline at end of file
+    return ''.join(random.choices(string.digits, k=6))
+
+def parse_bool(value) -> bool:
+    """ Parse a boolean sent as JSON or as a form/CSV string, where only 'true' is true. """
+    return str(value).lower() == 'true'
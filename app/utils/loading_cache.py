@@ -0,0 +1,60 @@
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+
+class LoadingCache(ABC):
+    """
+    LRU cache of values loaded on demand from the database and invalidated by
+    key from the content write paths. Subclasses implement ``load``.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        # Bumped on invalidation so a value loaded concurrently is not stored stale
+        self._generations: Dict[Hashable, int] = {}
+
+    @abstractmethod
+    def load(self, key: Hashable) -> Optional[Any]:
+        """Load the value of a key, or None if it does not exist."""
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get the value of a key, or None if it does not exist.
+        Only queries the database when the value is not cached.
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                return value
+            generation = self._generations.get(key, 0)
+
+        value = self.load(key)
+        if value is None:
+            return None
+
+        with self._lock:
+            if self._generations.get(key, 0) == generation:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, keys: Iterable[Optional[Hashable]]) -> None:
+        """Drop the values of the given keys."""
+        with self._lock:
+            for key in keys:
+                if key is not None:
+                    self._entries.pop(key, None)
+                    self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self) -> None:
+        """Drop all values."""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
@@ -0,0 +1,58 @@
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+from flask import current_app, request
+from werkzeug.exceptions import BadRequest
+from app import db
+
+
+def encode_cursor(last_id: int) -> str:
+    """ Encode the id of the last returned row into an opaque cursor. """
+    payload = json.dumps({'id': last_id}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> int:
+    """ Decode an opaque cursor back into the id of the last returned row. """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))['id']
+        if not isinstance(last_id, int):
+            raise ValueError("Cursor id must be an integer")
+        return last_id
+    except Exception:
+        raise BadRequest("Invalid cursor")
+
+
+def get_page_args() -> Tuple[Optional[int], int]:
+    """
+    Read the ``cursor`` and ``limit`` query parameters of the current request.
+    The limit is clamped to PAGE_SIZE_MAX.
+    """
+    default_limit = current_app.config.get('PAGE_SIZE_DEFAULT', 50)
+    max_limit = current_app.config.get('PAGE_SIZE_MAX', 200)
+
+    limit = request.args.get('limit', default_limit, type=int)
+    if limit < 1:
+        raise BadRequest("Limit must be a positive integer")
+    limit = min(limit, max_limit)
+
+    cursor = request.args.get('cursor')
+    after_id = decode_cursor(cursor) if cursor else None
+    return after_id, limit
+
+
+def paginate(stmt, id_column, after_id: Optional[int], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Apply keyset pagination on ``id_column`` to a Core select.
+    Returns the page of rows and the cursor of the next page, or None on the last page.
+    """
+    if after_id is not None:
+        stmt = stmt.where(id_column > after_id)
+    rows = db.session.execute(stmt.order_by(id_column).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id)
+    return rows, next_cursor
@@ -0,0 +1,101 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class HasherBusyError(RuntimeError):
+    """Raised when the hashing pool is saturated and the request should be retried later."""
+    pass
+
+
+def normalize_method(method: str) -> str:
+    """
+    Expand a hash method to the fully specified form werkzeug stores in the
+    hash, e.g. 'scrypt' to 'scrypt:32768:8:1' and 'pbkdf2' to
+    'pbkdf2:sha256:<default iterations>', so it can be compared with stored hashes.
+    """
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        n, r, p = map(int, args) if args else (2 ** 15, 8, 1)
+        return f'scrypt:{n}:{r}:{p}'
+    if name == 'pbkdf2':
+        if len(args) > 2:
+            raise ValueError("'pbkdf2' takes 2 arguments.")
+        hash_name = args[0] if args else 'sha256'
+        iterations = int(args[1]) if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{iterations}'
+    raise ValueError(f"Invalid hash method '{method}'.")
+
+
+class PasswordHasher:
+    """
+    Run password hashing and verification on a bounded worker pool.
+
+    The key derivation functions used by werkzeug (hashlib's pbkdf2_hmac and
+    scrypt) release the GIL, so a thread pool keeps request threads free to
+    serve cheap reads while hashes are computed. Work beyond the pool size plus
+    the queue limit is rejected immediately instead of piling up.
+    """
+
+    def __init__(self, method: str = 'pbkdf2:sha256:600000', salt_length: int = 16,
+                 workers: int = 4, queue_size: int = 32, timeout: float = 30):
+        self.method = normalize_method(method)
+        self.salt_length = salt_length
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """Configure the hasher from the app config."""
+        self.method = normalize_method(app.config.get('PASSWORD_HASH_METHOD', self.method))
+        self.salt_length = app.config.get('PASSWORD_SALT_LENGTH', self.salt_length)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.queue_size = app.config.get('PASSWORD_HASH_QUEUE_SIZE', self.queue_size)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def hash(self, password: str) -> str:
+        """Hash a password with the configured method and cost."""
+        return self._run(generate_password_hash, password, method=self.method, salt_length=self.salt_length)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        """Check a password against a stored hash."""
+        if not pwhash:
+            return False
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """Check whether a stored hash was made with other parameters than the configured ones."""
+        return bool(pwhash) and pwhash.split('$', 1)[0] != self.method
+
+    def _run(self, fn, *args, **kwargs):
+        executor, slots = self._get_pool()
+        if not slots.acquire(blocking=False):
+            logger.warning("Password hashing pool is saturated, rejecting request")
+            raise HasherBusyError("Server is busy, please try again later")
+        try:
+            future = executor.submit(fn, *args, **kwargs)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future.result(timeout=self.timeout)
+
+    def _get_pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hasher')
+                self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+            return self._executor, self._slots
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,38 @@
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    """ Increment the query counter of the current request. """
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+
+def get_query_count() -> int:
+    """ Get the number of SQL statements executed by the current request. """
+    return g.get('query_count', 0) if has_request_context() else 0
+
+
+def init_query_stats(app) -> None:
+    """ Record the number of SQL statements executed per request.
+
+    The count is exposed in the ``X-Query-Count`` response header and logged,
+    so read paths can be checked to stay flat as the content grows.
+    """
+    if not event.contains(Engine, 'before_cursor_execute', _count_query):
+        event.listen(Engine, 'before_cursor_execute', _count_query)
+
+    @app.before_request
+    def reset_query_count():
+        g.query_count = 0
+
+    @app.after_request
+    def add_query_count_header(response):
+        count = get_query_count()
+        response.headers['X-Query-Count'] = str(count)
+        logger.debug(f"{request.method} {request.path} executed {count} queries")
+        return response
@@ -0,0 +1,59 @@
+from array import array
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import select
+
+from app import db
+from app.models.level import Level
+from app.models.section import Section
+from app.models.question import Question
+from app.utils.loading_cache import LoadingCache
+
+# Cache keys are ('section', section_id) or ('level', level_id)
+PoolKey = Tuple[str, int]
+
+
+class QuizPoolCache(LoadingCache):
+    """
+    LRU cache of the question ids of each section and level, stored as compact
+    integer arrays that quizzes are sampled from in memory.
+    """
+
+    def init_app(self, app) -> None:
+        """Configure the cache from the app config."""
+        self.max_entries = app.config.get('QUIZ_POOL_CACHE_MAX_ENTRIES', self.max_entries)
+        self.clear()
+
+    def load(self, key: PoolKey) -> Optional[array]:
+        """
+        Load the sorted question ids of a section or level with one query.
+        Returns None if the section or level does not exist.
+        """
+        scope, scope_id = key
+        if scope == 'section':
+            stmt = (
+                select(Section.id, Question.id)
+                .outerjoin(Question, Question.section_id == Section.id)
+                .where(Section.id == scope_id)
+            )
+        else:
+            stmt = (
+                select(Level.id, Question.id)
+                .outerjoin(Section, Section.level_id == Level.id)
+                .outerjoin(Question, Question.section_id == Section.id)
+                .where(Level.id == scope_id)
+            )
+        rows = db.session.execute(stmt.order_by(Question.id)).all()
+        if not rows:
+            return None
+        return array('q', [question_id for _, question_id in rows if question_id is not None])
+
+    def invalidate_sections(self, section_ids: Iterable[Optional[int]]) -> None:
+        """Drop the question ids of the given sections."""
+        self.invalidate(('section', section_id) for section_id in section_ids if section_id)
+
+    def invalidate_levels(self, level_ids: Iterable[Optional[int]]) -> None:
+        """Drop the question ids of the given levels."""
+        self.invalidate(('level', level_id) for level_id in level_ids if level_id)
+
+
+quiz_pool_cache = QuizPoolCache()
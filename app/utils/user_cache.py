@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import event, inspect
+
+from app import db
+from app.models.user import User
+
+# Cached marker for user ids that do not exist
+_MISSING = object()
+
+
+class UserCache:
+    """TTL/LRU cache of user existence and role, used by the auth decorators."""
+
+    def __init__(self, ttl: float = 60, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+
+    def init_app(self, app) -> None:
+        """Configure the cache from the app config."""
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+        self.max_entries = app.config.get('USER_CACHE_MAX_ENTRIES', self.max_entries)
+        self.clear()
+
+    def get_role(self, user_id) -> Optional[str]:
+        """
+        Get the role value of a user, or None if the user does not exist.
+        Only queries the database when the entry is missing or expired.
+        """
+        user_id = int(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                return None if entry[0] is _MISSING else entry[0]
+
+        row = db.session.query(User.role).filter(User.id == user_id).first()
+        role = row[0].value if row else _MISSING
+
+        with self._lock:
+            self._entries[user_id] = (role, now + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return None if role is _MISSING else role
+
+    def invalidate(self, user_id) -> None:
+        """Drop the cached entry of a user."""
+        with self._lock:
+            self._entries.pop(int(user_id), None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(User, 'after_update')
+def _invalidate_on_role_change(mapper, connection, target):
+    if inspect(target).attrs.role.history.has_changes():
+        user_cache.invalidate(target.id)
+
+
+@event.listens_for(User, 'after_delete')
+def _invalidate_on_delete(mapper, connection, target):
+    user_cache.invalidate(target.id)
@@ -0,0 +1,44 @@
+"""Add media objects
+
+Revision ID: 8e3f4a1b6c27
+Revises: 5c1d7e2a9b41
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e3f4a1b6c27'
+down_revision = '5c1d7e2a9b41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('media_objects',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('path', sa.String(length=255), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('path')
+    )
+
+    # Count the references to files uploaded before media objects existed
+    op.execute("""
+        INSERT INTO media_objects (path, ref_count, created_at)
+        SELECT path, COUNT(*), CURRENT_TIMESTAMP FROM (
+            SELECT image_url AS path FROM levels WHERE image_url LIKE 'uploads/%'
+            UNION ALL SELECT image FROM sections WHERE image LIKE 'uploads/%'
+            UNION ALL SELECT question_content FROM questions WHERE question_content LIKE 'uploads/%'
+            UNION ALL SELECT content FROM question_choices WHERE content LIKE 'uploads/%'
+        ) refs
+        GROUP BY path
+    """)
+
+
+def downgrade():
+    op.drop_table('media_objects')
@@ -0,0 +1,45 @@
+"""Add question stats
+
+Revision ID: a9e5b3d17c40
+Revises: f1c3e7a92b58
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9e5b3d17c40'
+down_revision = 'f1c3e7a92b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('question_stats',
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('responses', sa.Integer(), nullable=False),
+    sa.Column('p_value', sa.Float(), nullable=False),
+    sa.Column('discrimination', sa.Float(), nullable=True),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], name='fk_question_stats_question_id_questions', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('question_id')
+    )
+    op.create_table('choice_stats',
+    sa.Column('choice_id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('selections', sa.Integer(), nullable=False),
+    sa.Column('selection_rate', sa.Float(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['choice_id'], ['question_choices.id'], name='fk_choice_stats_choice_id_question_choices', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], name='fk_choice_stats_question_id_questions', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('choice_id')
+    )
+    op.create_index('ix_choice_stats_question_id', 'choice_stats', ['question_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_choice_stats_question_id', table_name='choice_stats')
+    op.drop_table('choice_stats')
+    op.drop_table('question_stats')
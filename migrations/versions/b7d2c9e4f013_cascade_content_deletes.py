@@ -0,0 +1,52 @@
+"""Cascade content deletes in the database
+
+Revision ID: b7d2c9e4f013
+Revises: 8e3f4a1b6c27
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2c9e4f013'
+down_revision = '8e3f4a1b6c27'
+branch_labels = None
+depends_on = None
+
+# (table, column, referred table) of the content foreign keys
+CONTENT_FOREIGN_KEYS = (
+    ('sections', 'level_id', 'levels'),
+    ('questions', 'section_id', 'sections'),
+    ('question_choices', 'question_id', 'questions'),
+)
+
+# Names SQLite gives to the unnamed constraints of the initial migration
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _constraint_name(table, column, referred_table):
+    return f'fk_{table}_{column}_{referred_table}'
+
+
+def _replace_foreign_keys(ondelete):
+    inspector = sa.inspect(op.get_bind())
+    for table, column, referred_table in CONTENT_FOREIGN_KEYS:
+        name = _constraint_name(table, column, referred_table)
+        existing = next(
+            (fk['name'] for fk in inspector.get_foreign_keys(table)
+             if fk['constrained_columns'] == [column] and fk['referred_table'] == referred_table),
+            None
+        ) or name
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint(existing, type_='foreignkey')
+            batch_op.create_foreign_key(name, referred_table, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    _replace_foreign_keys('CASCADE')
+
+
+def downgrade():
+    _replace_foreign_keys(None)
@@ -0,0 +1,41 @@
+"""Count distinct questions in section progress
+
+Revision ID: c6e2a8d4f179
+Revises: a9e5b3d17c40
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e2a8d4f179'
+down_revision = 'a9e5b3d17c40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # attempted and correct used to add up every submitted answer; recount
+    # them as distinct questions, correct meaning the latest answer is correct
+    op.execute(sa.text("""
+        UPDATE section_progress SET
+            attempted = (
+                SELECT COUNT(DISTINCT a.question_id) FROM question_attempts a
+                WHERE a.user_id = section_progress.user_id AND a.section_id = section_progress.section_id
+            ),
+            correct = (
+                SELECT COUNT(*) FROM question_attempts a
+                WHERE a.user_id = section_progress.user_id AND a.section_id = section_progress.section_id
+                AND a.is_correct = :true AND a.id = (
+                    SELECT MAX(b.id) FROM question_attempts b
+                    WHERE b.user_id = a.user_id AND b.question_id = a.question_id
+                )
+            )
+    """).bindparams(true=True))
+
+
+def downgrade():
+    # The summed answer counts can't be told apart from the distinct ones
+    pass
@@ -0,0 +1,56 @@
+"""Add progress tracking
+
+Revision ID: d4a8f2c61e95
+Revises: b7d2c9e4f013
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8f2c61e95'
+down_revision = 'b7d2c9e4f013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('question_attempts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('section_id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('choice_id', sa.Integer(), nullable=True),
+    sa.Column('answer', sa.String(length=255), nullable=True),
+    sa.Column('is_correct', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='fk_question_attempts_user_id_users', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['section_id'], ['sections.id'], name='fk_question_attempts_section_id_sections', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], name='fk_question_attempts_question_id_questions', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['choice_id'], ['question_choices.id'], name='fk_question_attempts_choice_id_question_choices', ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_question_attempts_user_id_section_id', 'question_attempts', ['user_id', 'section_id'], unique=False)
+    op.create_index('ix_question_attempts_question_id', 'question_attempts', ['question_id'], unique=False)
+
+    op.create_table('section_progress',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('section_id', sa.Integer(), nullable=False),
+    sa.Column('submissions', sa.Integer(), nullable=False),
+    sa.Column('attempted', sa.Integer(), nullable=False),
+    sa.Column('correct', sa.Integer(), nullable=False),
+    sa.Column('best_score', sa.Float(), nullable=False),
+    sa.Column('last_activity_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='fk_section_progress_user_id_users', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['section_id'], ['sections.id'], name='fk_section_progress_section_id_sections', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'section_id')
+    )
+
+
+def downgrade():
+    op.drop_table('section_progress')
+    op.drop_index('ix_question_attempts_question_id', table_name='question_attempts')
+    op.drop_index('ix_question_attempts_user_id_section_id', table_name='question_attempts')
+    op.drop_table('question_attempts')
@@ -0,0 +1,26 @@
+"""Add question import token
+
+Revision ID: e8b4d1f6a273
+Revises: c6e2a8d4f179
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b4d1f6a273'
+down_revision = 'c6e2a8d4f179'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('questions', sa.Column('import_token', sa.String(length=48), nullable=True))
+    op.create_index('ix_questions_import_token', 'questions', ['import_token'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_questions_import_token', table_name='questions')
+    op.drop_column('questions', 'import_token')
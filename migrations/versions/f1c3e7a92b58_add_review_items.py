@@ -0,0 +1,38 @@
+"""Add review items
+
+Revision ID: f1c3e7a92b58
+Revises: d4a8f2c61e95
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c3e7a92b58'
+down_revision = 'd4a8f2c61e95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('review_items',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('ease', sa.Float(), nullable=False),
+    sa.Column('interval_days', sa.Integer(), nullable=False),
+    sa.Column('repetitions', sa.Integer(), nullable=False),
+    sa.Column('lapses', sa.Integer(), nullable=False),
+    sa.Column('due_at', sa.DateTime(), nullable=False),
+    sa.Column('last_reviewed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name='fk_review_items_user_id_users', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], name='fk_review_items_question_id_questions', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'question_id')
+    )
+    op.create_index('ix_review_items_user_id_due_at', 'review_items', ['user_id', 'due_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_review_items_user_id_due_at', table_name='review_items')
+    op.drop_table('review_items')
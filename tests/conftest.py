@@ -0,0 +1,82 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import User, UserRole, Level, Section, Question, QuestionChoice
+from app.models.question import QuestionType, AnswerType, ChoiceType
+from app.utils.file_upload import _unlink_executor
+
+# Smallest payload accepted as a PNG upload
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 64
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'SECRET_KEY': 'test',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'JWT_SECRET_KEY': 'test-jwt-secret-with-at-least-32-bytes',
+        'JWT_VERIFY_SUB': False,
+        'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+        'BUNDLE_FOLDER': str(tmp_path / 'bundles'),
+        'MAX_CONTENT_LENGTH': 5 * 1024 * 1024,
+        'ALLOWED_EXTENSIONS': {'png', 'jpg', 'jpeg', 'gif', 'webp', 'mp3', 'wav', 'ogg', 'm4a'},
+        'EMAIL_OUTBOX_WORKER': False,
+        'PROGRESS_WRITE_BEHIND': False,
+        'TESTING': True,
+    })
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers(app):
+    with app.app_context():
+        admin = User(email='admin@example.com', username='admin', role=UserRole.ADMIN, is_verified=True)
+        admin.set_password('password')
+        db.session.add(admin)
+        db.session.commit()
+        return {'Authorization': f'Bearer {create_access_token(identity=admin.id)}'}
+
+
+@pytest.fixture
+def section(app):
+    """
+    A section with a multiple-choice question (first choice correct) and a
+    fill-in-the-blank question. Returns the ids of the created rows.
+    """
+    with app.app_context():
+        level = Level(name='Level', description='Level')
+        section = Section(name='Section', level=level)
+        choice_question = Question(section=section, question_type=QuestionType.TEXT, question_content='Pick one',
+                                   answer_type=AnswerType.MULTIPLE_CHOICE)
+        choice_question.choices = [
+            QuestionChoice(choice_type=ChoiceType.TEXT, content=f'choice {i}', is_correct=i == 0)
+            for i in range(3)
+        ]
+        blank_question = Question(section=section, question_type=QuestionType.TEXT, question_content='Hello',
+                                  answer_type=AnswerType.FILL_IN_BLANK, correct_answer='bonjour|salut')
+        db.session.add_all([level, section, choice_question, blank_question])
+        db.session.commit()
+        return {
+            'level_id': level.id,
+            'section_id': section.id,
+            'choice_question_id': choice_question.id,
+            'choice_ids': [choice.id for choice in choice_question.choices],
+            'blank_question_id': blank_question.id,
+        }
+
+
+def wait_for_unlink():
+    """Wait for the files released by earlier commits to be removed."""
+    _unlink_executor.submit(lambda: None).result()
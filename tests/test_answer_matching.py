@@ -0,0 +1,38 @@
+from app.utils.answer_matching import AnswerMatcher, bounded_distance, normalize_answer, split_answers
+
+
+def test_answers_are_normalized():
+    assert normalize_answer('  Ça  VA?! ', ['latin']) == 'ca va'
+    assert normalize_answer('Ça va', []) == 'ça va'
+    assert split_answers(' bonjour | salut ||') == ['bonjour', 'salut']
+
+
+def test_exact_and_alternate_answers_match_without_typos():
+    matcher = AnswerMatcher('bonjour|salut')
+    assert matcher.match('Bonjour') == 0
+    assert matcher.match('SALUT!') == 0
+    assert matcher.match('') is None
+    assert matcher.match(None) is None
+
+
+def test_typos_are_tolerated_in_long_enough_answers():
+    matcher = AnswerMatcher('bonjour|oui')
+    assert matcher.match('bonjuor') == 1
+    assert matcher.match('bnjuor') is None
+    assert matcher.match('ouu') is None
+
+
+def test_diacritics_are_ignored_in_the_configured_scripts():
+    assert AnswerMatcher('élève').match('eleve') == 0
+    assert AnswerMatcher('élève', diacritic_scripts=()).match('eleve') is None
+
+
+def test_numbers_and_other_scripts_must_match_exactly():
+    assert AnswerMatcher('1984').match('1985') is None
+    assert AnswerMatcher('がっこう').match('かっこう') is None
+    assert AnswerMatcher('がっこう').match('がっこう') == 0
+
+
+def test_bounded_distance_stops_past_the_limit():
+    assert bounded_distance('kitten', 'sitting', 3) == 3
+    assert bounded_distance('kitten', 'sitting', 2) is None
@@ -0,0 +1,76 @@
+import io
+
+from app.models.media_object import MediaObject
+from app.models.question import QuestionChoice
+from tests.conftest import PNG
+
+
+def get_choices(app, question_id):
+    with app.app_context():
+        choices = QuestionChoice.query.filter_by(question_id=question_id).order_by(QuestionChoice.id)
+        return [(choice.id, choice.choice_type.value, choice.content, choice.is_correct) for choice in choices]
+
+
+def test_existing_choices_are_updated_in_place(app, client, admin_headers, section):
+    question_id = section['choice_question_id']
+    first, second, third = section['choice_ids']
+
+    response = client.put(f'/api/question/{question_id}', headers=admin_headers, json={'choices': [
+        {'id': first},
+        {'id': second, 'content': 'changed'},
+        {'type': 'text', 'content': 'added', 'is_correct': 'false'},
+    ]})
+    assert response.status_code == 200, response.json
+
+    choices = get_choices(app, question_id)
+    assert choices[:2] == [(first, 'text', 'choice 0', True), (second, 'text', 'changed', False)]
+    assert choices[2][1:] == ('text', 'added', False)
+    assert third not in [choice_id for choice_id, *_ in choices]
+
+
+def test_omitted_is_correct_keeps_the_stored_value(app, client, admin_headers, section):
+    question_id = section['choice_question_id']
+    first, second, third = section['choice_ids']
+
+    response = client.put(f'/api/question/{question_id}', headers=admin_headers, json={'choices': [
+        {'id': first, 'is_correct': False},
+        {'id': second},
+        {'id': third},
+    ]})
+    assert response.status_code == 400
+
+    response = client.put(f'/api/question/{question_id}', headers=admin_headers, json={'choices': [
+        {'id': first, 'is_correct': 'false'},
+        {'id': second, 'is_correct': 'true'},
+        {'id': third},
+    ]})
+    assert response.status_code == 200, response.json
+    assert [is_correct for *_, is_correct in get_choices(app, question_id)] == [False, True, False]
+
+
+def test_choice_of_another_question_is_rejected(client, admin_headers, section):
+    response = client.put(f"/api/question/{section['choice_question_id']}", headers=admin_headers,
+                          json={'choices': [{'id': 999, 'is_correct': True}]})
+    assert response.status_code == 400
+
+
+def test_new_choice_referencing_a_stored_file_takes_a_reference(app, client, admin_headers, section):
+    question_id = section['choice_question_id']
+    response = client.post(f'/api/question/{question_id}/choices', headers=admin_headers,
+                           content_type='multipart/form-data',
+                           data={'choice_type': 'image', 'content': (io.BytesIO(PNG), 'image.png')})
+    assert response.status_code == 200, response.json
+    image = response.json['data']
+
+    choices = [{'id': choice_id} for choice_id in section['choice_ids']]
+    choices += [{'id': image['id']}, {'type': 'image', 'content': image['content']}]
+    response = client.put(f'/api/question/{question_id}', headers=admin_headers, json={'choices': choices})
+    assert response.status_code == 200, response.json
+
+    with app.app_context():
+        assert MediaObject.query.filter_by(path=image['content']).one().ref_count == 2
+
+    response = client.put(f'/api/question/{question_id}', headers=admin_headers, json={'choices': [
+        {'id': section['choice_ids'][0]}, {'type': 'image', 'content': 'uploads/questions/missing.png'},
+    ]})
+    assert response.status_code == 400
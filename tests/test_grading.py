@@ -0,0 +1,37 @@
+def submit(client, headers, section_id, answers):
+    return client.post(f'/api/section/{section_id}/submit', headers=headers, json={'answers': answers})
+
+
+def test_submission_is_graded_against_the_answer_key(client, admin_headers, section):
+    correct_choice, wrong_choice, _ = section['choice_ids']
+    response = submit(client, admin_headers, section['section_id'], [
+        {'question_id': section['choice_question_id'], 'choice_id': correct_choice},
+        {'question_id': section['blank_question_id'], 'answer': '  Salut! '},
+    ])
+    assert response.status_code == 200, response.json
+    data = response.json['data']
+    assert (data['total'], data['answered'], data['correct'], data['score']) == (2, 2, 2, 1.0)
+
+    response = submit(client, admin_headers, section['section_id'], [
+        {'question_id': section['choice_question_id'], 'choice_ids': [correct_choice, wrong_choice]},
+    ])
+    data = response.json['data']
+    assert (data['answered'], data['correct'], data['score']) == (1, 0, 0.0)
+    assert data['results'][0]['correct_choice_ids'] == [correct_choice]
+
+
+def test_unknown_section_and_question_are_rejected(client, admin_headers, section):
+    answers = [{'question_id': section['blank_question_id'], 'answer': 'bonjour'}]
+    assert submit(client, admin_headers, 999, answers).status_code == 404
+    response = submit(client, admin_headers, section['section_id'], [{'question_id': 999, 'answer': 'bonjour'}])
+    assert response.status_code == 400
+
+
+def test_answer_key_follows_question_updates(client, admin_headers, section):
+    answers = [{'question_id': section['blank_question_id'], 'answer': 'merci'}]
+    assert submit(client, admin_headers, section['section_id'], answers).json['data']['correct'] == 0
+
+    response = client.put(f"/api/question/{section['blank_question_id']}", headers=admin_headers,
+                          json={'correct_answer': 'merci'})
+    assert response.status_code == 200, response.json
+    assert submit(client, admin_headers, section['section_id'], answers).json['data']['correct'] == 1
@@ -0,0 +1,66 @@
+import io
+import os
+
+from app.models.media_object import MediaObject
+from app.utils.file_upload import get_media_path
+from tests.conftest import PNG, wait_for_unlink
+
+
+def media_refs(app):
+    wait_for_unlink()
+    with app.app_context():
+        return {media.path: media.ref_count for media in MediaObject.query.all()}
+
+
+def is_stored(app, path):
+    with app.app_context():
+        return os.path.isfile(get_media_path(path))
+
+
+def upload_section(client, headers, level_id, name, method='POST', url='/api/section'):
+    response = client.open(url, method=method, headers=headers, content_type='multipart/form-data',
+                           data={'name': name, 'level_id': str(level_id), 'image': (io.BytesIO(PNG), 'image.png')})
+    assert response.status_code in (200, 201), response.json
+    return response.json['data']
+
+
+def test_identical_uploads_share_one_file(app, client, admin_headers, section):
+    first = upload_section(client, admin_headers, section['level_id'], 'First')
+    second = upload_section(client, admin_headers, section['level_id'], 'Second')
+
+    assert first['image'] == second['image']
+    assert media_refs(app) == {first['image']: 2}
+
+    client.delete(f"/api/section/{first['id']}", headers=admin_headers)
+    assert media_refs(app) == {first['image']: 1}
+    assert is_stored(app, first['image'])
+
+
+def test_reuploading_the_same_file_keeps_one_reference(app, client, admin_headers, section):
+    created = upload_section(client, admin_headers, section['level_id'], 'Pictures')
+    for _ in range(2):
+        upload_section(client, admin_headers, section['level_id'], 'Pictures', method='PUT',
+                       url=f"/api/section/{created['id']}")
+    assert media_refs(app) == {created['image']: 1}
+
+    client.delete(f"/api/section/{created['id']}", headers=admin_headers)
+    assert media_refs(app) == {}
+    assert not is_stored(app, created['image'])
+
+
+def test_replacing_a_choice_file_releases_the_old_one(app, client, admin_headers, section):
+    url = f"/api/question/{section['choice_question_id']}/choices"
+    response = client.post(url, headers=admin_headers, content_type='multipart/form-data',
+                           data={'choice_type': 'image', 'content': (io.BytesIO(PNG), 'image.png')})
+    assert response.status_code == 200, response.json
+    old_path = response.json['data']['content']
+
+    response = client.put(f"{url}/{response.json['data']['id']}", headers=admin_headers,
+                          content_type='multipart/form-data',
+                          data={'content': ['replace', (io.BytesIO(PNG + b'new'), 'image.png')]})
+    assert response.status_code == 200, response.json
+    new_path = response.json['data']['content']
+
+    assert new_path != old_path
+    assert media_refs(app) == {new_path: 1}
+    assert not is_stored(app, old_path)
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from app.models import User
+from app.services.review_service import (ReviewService, QUALITY_CORRECT, QUALITY_INCORRECT, QUALITY_TYPO,
+                                         answer_quality)
+
+REVIEWED_AT = datetime(2026, 1, 1)
+
+
+def test_correct_answers_grow_the_interval():
+    state = None
+    intervals = []
+    for _ in range(4):
+        state = ReviewService.schedule(state, QUALITY_CORRECT, REVIEWED_AT)
+        intervals.append(state['interval_days'])
+    assert intervals == [1, 6, 16, 45]
+    assert state['ease'] == 2.9
+    assert state['due_at'] == REVIEWED_AT + timedelta(days=45)
+
+
+def test_failed_answer_resets_the_repetitions():
+    state = ReviewService.schedule(None, QUALITY_INCORRECT, REVIEWED_AT)
+    assert (state['interval_days'], state['repetitions'], state['lapses']) == (1, 0, 0)
+
+    state = ReviewService.schedule(state, QUALITY_CORRECT, REVIEWED_AT)
+    state = ReviewService.schedule(state, QUALITY_CORRECT, REVIEWED_AT)
+    state = ReviewService.schedule(state, QUALITY_INCORRECT, REVIEWED_AT)
+    assert (state['interval_days'], state['repetitions'], state['lapses']) == (1, 0, 1)
+    assert state['ease'] >= 1.3
+
+
+def test_answer_quality():
+    assert answer_quality(True) == QUALITY_CORRECT
+    assert answer_quality(True, typos=1) == QUALITY_TYPO
+    assert answer_quality(False) == QUALITY_INCORRECT
+
+
+def test_answered_questions_become_due(app, client, admin_headers, section):
+    response = client.post(f"/api/section/{section['section_id']}/submit", headers=admin_headers, json={'answers': [
+        {'question_id': section['choice_question_id'], 'choice_id': section['choice_ids'][1]},
+        {'question_id': section['blank_question_id'], 'answer': 'bonjour'},
+    ]})
+    assert response.status_code == 200, response.json
+
+    response = client.get('/api/review/next', headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json['data'] == []
+
+    with app.app_context():
+        user_id = User.query.filter_by(email='admin@example.com').one().id
+        due = ReviewService().get_due(user_id, now=datetime.utcnow() + timedelta(days=2))
+        assert ReviewService.get_answered(user_id, [section['choice_question_id'], section['blank_question_id']]) == {
+            section['choice_question_id']: False,
+            section['blank_question_id']: True,
+        }
+    assert {item['id'] for item in due} == {section['choice_question_id'], section['blank_question_id']}
+    assert all(item['review']['interval_days'] == 1 for item in due)